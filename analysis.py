@@ -0,0 +1,113 @@
+import collections
+import numpy as np
+
+SINGULAR_TOLERANCE = 1e-10
+REAL_TOLERANCE = 1e-9
+
+MatrixAnalysis = collections.namedtuple("MatrixAnalysis", [
+    "determinant",       # Volume scaling factor
+    "inverse",           # None when the matrix is singular
+    "eigenvalues",       # Complex array of 3
+    "eigenvectors",      # Complex 3x3, eigenvectors as columns
+    "singular_values",   # Descending
+    "rank",
+    "invariant_axes",    # Real unit eigenvectors as rows, shape (k, 3)
+])
+
+
+def matrix_key(matrix):
+    """Canonical bytes of a 3x3 matrix, used as the cache key"""
+    canonical = np.ascontiguousarray(matrix, dtype=np.float64).reshape(3, 3)
+    # Adding 0.0 turns -0.0 into 0.0 so both hash the same
+    return (canonical + 0.0).tobytes()
+
+
+def analyze_batch(matrices):
+    """Analyse a (B, 3, 3) stack with one vectorized np.linalg call per quantity"""
+    matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 3, 3)
+    determinants = np.linalg.det(matrices)
+    eigenvalues, eigenvectors = np.linalg.eig(matrices)
+    singular_values = np.linalg.svd(matrices, compute_uv=False)
+    ranks = (singular_values > SINGULAR_TOLERANCE * np.maximum(singular_values[:, :1], 1.0)).sum(axis=1)
+
+    invertible = np.abs(determinants) > SINGULAR_TOLERANCE
+    inverses = np.full(matrices.shape, np.nan)
+    if invertible.any():
+        inverses[invertible] = np.linalg.inv(matrices[invertible])
+
+    real = np.abs(eigenvalues.imag) < REAL_TOLERANCE
+
+    results = []
+    for i in range(len(matrices)):
+        axes = eigenvectors[i][:, real[i]].real.T
+        axes = axes / np.linalg.norm(axes, axis=1, keepdims=True)
+        results.append(MatrixAnalysis(
+            determinant=float(determinants[i]),
+            inverse=inverses[i] if invertible[i] else None,
+            eigenvalues=eigenvalues[i],
+            eigenvectors=eigenvectors[i],
+            singular_values=singular_values[i],
+            rank=int(ranks[i]),
+            invariant_axes=axes,
+        ))
+    return results
+
+
+class MatrixAnalyzer:
+    """Bounded LRU cache of matrix analyses keyed by the matrix bytes"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.cache = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def store(self, key, result):
+        self.cache[key] = result
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+
+    def analyze(self, matrix):
+        """Analysis of one matrix, computed on first use"""
+        key = matrix_key(matrix)
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        self.misses += 1
+        result = analyze_batch(np.frombuffer(key).reshape(1, 3, 3))[0]
+        self.store(key, result)
+        return result
+
+    def analyze_many(self, matrices):
+        """Analyses of a stack of matrices; cache misses are computed in one batch"""
+        matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 3, 3)
+        keys = [matrix_key(m) for m in matrices]
+        missing = [i for i, key in enumerate(keys) if key not in self.cache]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        computed = dict(zip(missing, analyze_batch(matrices[missing]))) if missing else {}
+
+        # Collect every result before storing, since storing may evict earlier hits
+        results = [computed[i] if i in computed else self.cache[key] for i, key in enumerate(keys)]
+        for key, result in zip(keys, results):
+            self.store(key, result)
+        return results
+
+    def precompute(self, matrices):
+        """Warm the cache, e.g. with the GUI presets at startup"""
+        self.analyze_many(list(matrices))
+
+    def clear(self):
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Shared analyzer used by the visualizer and the matrix editor
+analyzer = MatrixAnalyzer()
+
+
+def analyze(matrix):
+    return analyzer.analyze(matrix)
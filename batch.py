@@ -0,0 +1,100 @@
+"""Vectorized evaluation of many matrices against the unit cube and basis
+
+    angles = np.linspace(0, 2 * np.pi, 10000)
+    result = transform_batch(rotation_matrices(angles, axis=2))
+    result.cubes.shape  # (10000, 8, 3)
+"""
+import collections
+import concurrent.futures
+import multiprocessing
+import os
+
+import numpy as np
+
+from cube import get_unit_cube_vertices
+
+CHUNK_SIZE = 65536  # Matrices per vectorized pass
+
+BatchResult = collections.namedtuple("BatchResult", [
+    "cubes",          # (B, 8, 3) transformed unit cube vertices
+    "bases",          # (B, 3, 3) transformed basis vectors as rows
+    "determinants",   # (B,)
+    "volumes",        # (B,) volume of the transformed unit cube, |det|
+])
+
+
+def as_matrix_stack(matrices):
+    """Return matrices as a float64 (B, 3, 3) array"""
+    matrices = np.asarray(matrices, dtype=np.float64)
+    if matrices.size % 9:
+        raise ValueError(f"Expected 3x3 matrices, got shape {matrices.shape}")
+    return matrices.reshape(-1, 3, 3)
+
+
+def rotation_matrices(angles, axis=2):
+    """Rotations by each angle (radians) about the x, y or z axis, shape (B, 3, 3)"""
+    angles = np.asarray(angles, dtype=np.float64).ravel()
+    c, s = np.cos(angles), np.sin(angles)
+    i, j = [k for k in range(3) if k != axis]
+    matrices = np.zeros((len(angles), 3, 3))
+    matrices[:, axis, axis] = 1.0
+    matrices[:, i, i] = c
+    matrices[:, i, j] = -s
+    matrices[:, j, i] = s
+    matrices[:, j, j] = c
+    return matrices
+
+
+def shear_matrices(factors, row=0, column=1):
+    """Identity with each factor placed at (row, column), shape (B, 3, 3)"""
+    factors = np.asarray(factors, dtype=np.float64).ravel()
+    matrices = np.tile(np.eye(3), (len(factors), 1, 1))
+    matrices[:, row, column] = factors
+    return matrices
+
+
+def transform_chunk(matrices, cube=None):
+    """Cubes, bases, determinants and volumes for one (B, 3, 3) chunk"""
+    cube = get_unit_cube_vertices() if cube is None else cube
+    transposed = matrices.transpose(0, 2, 1)
+    # Row vectors times M^T, as in transform.apply_matrix; the basis rows are the images of e_x, e_y, e_z
+    cubes = np.matmul(cube, transposed)
+    determinants = np.linalg.det(matrices)
+    return cubes, transposed.copy(), determinants, np.abs(determinants)
+
+
+def transform_batch(matrices, chunk_size=CHUNK_SIZE, workers=1):
+    """Transform the unit cube and basis by a (B, 3, 3) stack of matrices
+
+    Matrices are processed chunk_size at a time, so intermediates stay bounded
+    whatever B is. With workers other than 1, chunks are spread over a
+    process pool (workers=None uses every CPU); this only pays off for very
+    large stacks, since each chunk is shipped to and from a worker.
+    """
+    matrices = as_matrix_stack(matrices)
+    count = len(matrices)
+    result = BatchResult(
+        cubes=np.empty((count, 8, 3)),
+        bases=np.empty((count, 3, 3)),
+        determinants=np.empty(count),
+        volumes=np.empty(count),
+    )
+    starts = range(0, count, chunk_size)
+    chunks = (matrices[start:start + chunk_size] for start in starts)
+
+    if workers == 1 or count <= chunk_size:
+        parts = map(transform_chunk, chunks)
+        return _collect(result, starts, parts, chunk_size)
+
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(workers, mp_context=context) as pool:
+        return _collect(result, starts, pool.map(transform_chunk, chunks), chunk_size)
+
+
+def _collect(result, starts, parts, chunk_size):
+    """Copy each chunk's arrays into the preallocated result"""
+    for start, part in zip(starts, parts):
+        for out, values in zip(result, part):
+            out[start:start + chunk_size] = values
+    return result
@@ -0,0 +1,130 @@
+import math
+import numpy as np
+
+FIELD_OF_VIEW = 45
+NEAR_PLANE = 0.1
+FAR_PLANE = 50.0
+
+
+def camera_position(distance, angle_x, angle_y):
+    """Eye position orbiting the origin, angles in degrees"""
+    x = distance * math.cos(math.radians(angle_x)) * math.sin(math.radians(angle_y))
+    y = distance * math.sin(math.radians(angle_x))
+    z = distance * math.cos(math.radians(angle_x)) * math.cos(math.radians(angle_y))
+    return x, y, z
+
+
+def look_at(eye, target=(0, 0, 0), up=(0, 1, 0)):
+    """4x4 view matrix matching gluLookAt"""
+    eye = np.asarray(eye, dtype=float)
+    forward = np.asarray(target, dtype=float) - eye
+    forward /= np.linalg.norm(forward)
+    side = np.cross(forward, up)
+    side /= np.linalg.norm(side)
+    upward = np.cross(side, forward)
+
+    view = np.eye(4)
+    view[0, :3] = side
+    view[1, :3] = upward
+    view[2, :3] = -forward
+    view[:3, 3] = -view[:3, :3] @ eye
+    return view
+
+
+def perspective(fovy=FIELD_OF_VIEW, aspect=1.0, near=NEAR_PLANE, far=FAR_PLANE):
+    """4x4 projection matrix matching gluPerspective"""
+    f = 1.0 / math.tan(math.radians(fovy) / 2)
+    projection = np.zeros((4, 4))
+    projection[0, 0] = f / aspect
+    projection[1, 1] = f
+    projection[2, 2] = (far + near) / (near - far)
+    projection[2, 3] = 2 * far * near / (near - far)
+    projection[3, 2] = -1
+    return projection
+
+
+class Camera:
+    """Camera orbiting the origin whose view matrices are cached until it moves
+
+    Angles are in degrees; angle_x (elevation) is clamped to +-89 and the
+    distance to [min_distance, max_distance]. version increases on every
+    change so callers can cache anything derived from the view.
+    """
+
+    def __init__(self, distance=8, angle_x=25, angle_y=45, aspect=1.0, min_distance=3, max_distance=20):
+        self.min_distance = min_distance
+        self.max_distance = max_distance
+        self.aspect = aspect
+        self.projection = perspective(aspect=aspect)
+        self._gl_projection = np.ascontiguousarray(self.projection.T)
+        self.version = 0
+        self.distance = self.angle_x = self.angle_y = None
+        self.set(distance, angle_x, angle_y)
+
+    def set(self, distance=None, angle_x=None, angle_y=None):
+        """Move the camera; unchanged values are left as they are"""
+        distance = self.distance if distance is None else min(max(distance, self.min_distance), self.max_distance)
+        angle_x = self.angle_x if angle_x is None else min(max(angle_x, -89), 89)
+        angle_y = self.angle_y if angle_y is None else angle_y
+        if (distance, angle_x, angle_y) == (self.distance, self.angle_x, self.angle_y):
+            return False
+        self.distance = distance
+        self.angle_x = angle_x
+        self.angle_y = angle_y
+        self.version += 1
+        self._view = None
+        self._view_projection = None
+        self._inverse_view_projection = None
+        self._gl_view = None
+        return True
+
+    @property
+    def gl_projection(self):
+        """Projection matrix in OpenGL's column-major order, for glLoadMatrixd"""
+        return self._gl_projection
+
+    def orbit(self, delta_x, delta_y):
+        """Rotate by delta_x degrees of elevation and delta_y degrees around the vertical axis"""
+        return self.set(angle_x=self.angle_x + delta_x, angle_y=self.angle_y + delta_y)
+
+    def zoom(self, delta):
+        """Move delta units away from the origin (towards it when negative)"""
+        return self.set(distance=self.distance + delta)
+
+    @property
+    def eye(self):
+        return camera_position(self.distance, self.angle_x, self.angle_y)
+
+    @property
+    def view(self):
+        """4x4 view matrix, as gluLookAt would build it"""
+        if self._view is None:
+            self._view = look_at(self.eye)
+        return self._view
+
+    @property
+    def view_projection(self):
+        """Projection times view matrix, mapping world points to clip space"""
+        if self._view_projection is None:
+            self._view_projection = self.projection @ self.view
+        return self._view_projection
+
+    @property
+    def gl_view(self):
+        """View matrix in OpenGL's column-major order, for glLoadMatrixd"""
+        if self._gl_view is None:
+            self._gl_view = np.ascontiguousarray(self.view.T)
+        return self._gl_view
+
+    def ray(self, x, y, width, height):
+        """Origin and unit direction of the ray through window pixel (x, y), y pointing down"""
+        if self._inverse_view_projection is None:
+            self._inverse_view_projection = np.linalg.inv(self.view_projection)
+        ndc_x = 2.0 * x / width - 1.0
+        ndc_y = 1.0 - 2.0 * y / height
+        points = np.array([[ndc_x, ndc_y, -1.0, 1.0], [ndc_x, ndc_y, 1.0, 1.0]])
+        near, far = points @ self._inverse_view_projection.T
+        near = near[:3] / near[3]
+        far = far[:3] / far[3]
+        direction = far - near
+        return near, direction / np.linalg.norm(direction)
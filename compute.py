@@ -0,0 +1,76 @@
+"""GUI-free compute entry point
+
+Reads 3x3 matrices from the command line or stdin and prints the transformed
+unit cube, basis vectors and determinant as JSON. Only NumPy is imported, so
+this runs on servers without a display.
+
+    python compute.py 1 0.5 0 0 1 0 0 0 1
+    echo "[[0, -1, 0], [1, 0, 0], [0, 0, 1]]" | python compute.py
+"""
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from analysis import analyze_batch
+from batch import transform_batch
+
+
+def parse_matrices(text):
+    """Matrices from JSON (one matrix or a list of them) or whitespace/comma separated numbers"""
+    try:
+        values = json.loads(text)
+    except ValueError:
+        values = text.replace(",", " ").split()
+    try:
+        matrices = np.asarray(values, dtype=float)
+    except TypeError:
+        # e.g. a JSON object rather than numbers or nested lists of them
+        raise ValueError("Matrix entries must be numbers")
+    if matrices.size == 0 or matrices.size % 9:
+        raise ValueError(f"Expected a multiple of 9 matrix entries, got {matrices.size}")
+    if not np.isfinite(matrices).all():
+        raise ValueError("Matrix entries must be finite")
+    return matrices.reshape(-1, 3, 3)
+
+
+def describe_all(matrices):
+    """Transformed cube, basis and determinant of each matrix in a stack as plain Python values"""
+    matrices = np.asarray(matrices, dtype=float).reshape(-1, 3, 3)
+    result = transform_batch(matrices)
+    analyses = analyze_batch(matrices)
+    return [{
+        "matrix": matrix.tolist(),
+        "determinant": float(determinant),
+        "transformed_cube": cube.tolist(),
+        "transformed_basis": basis.tolist(),
+        "inverse": None if analysis.inverse is None else analysis.inverse.tolist(),
+    } for matrix, cube, basis, determinant, analysis
+        in zip(matrices, result.cubes, result.bases, result.determinants, analyses)]
+
+
+def describe(matrix):
+    """Transformed cube, basis and determinant of one matrix as plain Python values"""
+    return describe_all(matrix)[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transform the unit cube and basis by 3x3 matrices")
+    parser.add_argument("values", nargs="*",
+                        help="Matrix entries in row-major order (9 per matrix) or JSON; read from stdin if omitted")
+    parser.add_argument("--indent", type=int, default=None, help="Pretty-print the JSON output")
+    args = parser.parse_args(argv)
+
+    text = " ".join(args.values) if args.values else sys.stdin.read()
+    try:
+        matrices = parse_matrices(text)
+    except ValueError as e:
+        parser.error(str(e))
+
+    json.dump({"results": describe_all(matrices)}, sys.stdout, indent=args.indent)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
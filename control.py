@@ -0,0 +1,184 @@
+"""Local control server for driving a running visualizer
+
+Clients send one JSON object per line and get one JSON reply per line:
+
+    {"command": "apply", "matrix": [[1, 0.5, 0], [0, 1, 0], [0, 0, 1]]}
+    {"command": "reset"}
+    {"command": "camera", "distance": 10, "angle_x": 30, "angle_y": 60}
+    {"command": "duration", "seconds": 0.5}
+
+Replies are {"ok": true} once the command is queued for the render loop, or
+{"ok": false, "error": "..."}. The server runs an asyncio loop on a
+background thread; the render loop takes commands with poll() and never
+blocks on the network.
+
+    echo '{"command": "reset"}' | nc 127.0.0.1 8765
+"""
+import asyncio
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+DEFAULT_PORT = 8765
+MAX_PENDING = 1024     # Commands queued before clients are told the visualizer is busy
+MAX_LINE = 64 * 1024   # Longest accepted command, in bytes
+MAX_DURATION = 60.0    # Longest animation accepted by the duration command, in seconds
+
+
+def parse_address(address):
+    """("unix", path) for "unix:/path", else ("tcp", (host, port)) for "host:port" or "port" """
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port or DEFAULT_PORT))
+
+
+def parse_command(line):
+    """Validate one NDJSON line and return (name, argument); raises ValueError when malformed"""
+    try:
+        message = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    if not isinstance(message, dict):
+        raise ValueError("Expected a JSON object")
+
+    name = message.get("command")
+    if name == "apply":
+        try:
+            matrix = np.asarray(message["matrix"], dtype=float)
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("apply needs a numeric 'matrix'")
+        if matrix.size != 9 or not np.isfinite(matrix).all():
+            raise ValueError("'matrix' must hold 9 finite numbers")
+        return name, matrix.reshape(3, 3)
+    if name == "reset":
+        return name, None
+    if name == "camera":
+        view = {key: message[key] for key in ("distance", "angle_x", "angle_y") if key in message}
+        if not view or not all(isinstance(v, (int, float)) and np.isfinite(v) for v in view.values()):
+            raise ValueError("camera needs numeric 'distance', 'angle_x' and/or 'angle_y'")
+        return name, {key: float(v) for key, v in view.items()}
+    if name == "duration":
+        seconds = message.get("seconds")
+        if not isinstance(seconds, (int, float)) or not 0 < seconds <= MAX_DURATION:
+            raise ValueError(f"duration needs 'seconds' in (0, {MAX_DURATION}]")
+        return name, float(seconds)
+    raise ValueError(f"Unknown command: {name!r}")
+
+
+class ControlServer:
+    """Asyncio NDJSON server on a background thread feeding a bounded, non-blocking queue
+
+    notify, if given, is called from the server thread when a command arrives
+    while the queue is empty, e.g. to wake a render loop waiting for events.
+    """
+
+    def __init__(self, address=str(DEFAULT_PORT), notify=None, max_pending=MAX_PENDING):
+        self.kind, self.target = parse_address(address)
+        self.notify = notify
+        self.commands = queue.Queue(maxsize=max_pending)
+        self.address = None
+        self.loop = None
+        self.stopping = None
+        self.thread = None
+        self.error = None
+        self.clients = {}  # Handler task -> its writer, while the client is connected
+
+    def start(self):
+        """Start listening; raises OSError if the address cannot be bound"""
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self.run_loop, args=(ready,), name="control-server", daemon=True)
+        self.thread.start()
+        ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    def run_loop(self, ready):
+        asyncio.run(self.serve(ready))
+
+    async def serve(self, ready):
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        try:
+            if self.kind == "unix":
+                server = await asyncio.start_unix_server(self.handle_client, self.target, limit=MAX_LINE)
+            else:
+                server = await asyncio.start_server(self.handle_client, *self.target, limit=MAX_LINE)
+        except OSError as e:
+            self.error = e
+            ready.set()
+            return
+        self.address = server.sockets[0].getsockname()
+        ready.set()
+        async with server:
+            await self.stopping.wait()
+            server.close()
+            # Closing a client's stream ends its handler at the next read instead of cancelling it mid-read
+            for writer in self.clients.values():
+                writer.close()
+            await asyncio.gather(*self.clients, return_exceptions=True)
+
+    async def handle_client(self, reader, writer):
+        task = asyncio.current_task()
+        self.clients[task] = writer
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line longer than MAX_LINE; the stream cannot be resynchronised
+                    writer.write(b'{"ok": false, "error": "Command too long"}\n')
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                writer.write((json.dumps(self.submit(line)) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self.clients[task]
+            writer.close()
+
+    def submit(self, line):
+        """Queue one command line for the render loop and return the reply"""
+        try:
+            command = parse_command(line)
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
+        was_empty = self.commands.empty()
+        try:
+            self.commands.put_nowait(command)
+        except queue.Full:
+            return {"ok": False, "error": "Busy, command dropped"}
+        if was_empty and self.notify is not None:
+            self.notify()
+        return {"ok": True}
+
+    def poll(self, limit):
+        """Up to limit queued commands, oldest first, without blocking"""
+        commands = []
+        for _ in range(limit):
+            try:
+                commands.append(self.commands.get_nowait())
+            except queue.Empty:
+                break
+        return commands
+
+    def pending(self):
+        return not self.commands.empty()
+
+    def stop(self):
+        """Stop listening and wait for the server thread to exit"""
+        if self.thread is None:
+            return
+        if self.loop is not None and self.stopping is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+        self.thread.join(timeout=1.0)
+        self.thread = None
+        if self.kind == "unix" and self.error is None and os.path.exists(self.target):
+            os.unlink(self.target)
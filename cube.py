@@ -1,6 +1,8 @@
 ### cube.py
+import numpy as np
+
 def get_unit_cube_vertices():
-    return [
+    return np.array([
         [0, 0, 0],
         [1, 0, 0],
         [1, 1, 0],
@@ -9,12 +11,19 @@ def get_unit_cube_vertices():
         [1, 0, 1],
         [1, 1, 1],
         [0, 1, 1],
-    ]
+    ], dtype=float)
 
-cube_edges = [
+cube_edges = np.array([
     (0, 1), (1, 2), (2, 3), (3, 0),
     (4, 5), (5, 6), (6, 7), (7, 4),
     (0, 4), (1, 5), (2, 6), (3, 7)
-]
-
+], dtype=np.uint32)
 
+cube_faces = np.array([
+    (0, 1, 2, 3),  # bottom
+    (4, 5, 6, 7),  # top
+    (0, 1, 5, 4),  # front
+    (2, 3, 7, 6),  # back
+    (0, 3, 7, 4),  # left
+    (1, 2, 6, 5)   # right
+], dtype=np.uint32)
@@ -1,7 +1,7 @@
 ### draw.py
 from OpenGL.GL import *
+from renderer import draw_arrays
 
 def draw_cube(vertices, edges, color=(1, 1, 1)):
     glColor3fv(color)
-    glBegin(GL_LINES)
-   
\ No newline at end of file
+    draw_arrays(GL_LINES, vertices, indices=edges)
@@ -0,0 +1,327 @@
+"""Offline rendering of transformation animations to image sequences
+
+Rasterizes the visualizer's scene (grid, basis, origin, original and current
+cube; not the info panel) with NumPy instead of OpenGL, spreading frames
+across a process pool, so clips can be rendered on machines with no display
+or GPU. Primitives are drawn in the same order as the OpenGL renderer; there
+is no depth buffer.
+
+    python export.py --matrix 1 0.5 0 0 1 0 0 0 1 --matrix 0 -1 0 1 0 0 0 0 1 \\
+        --frames 240 --output frames --format png
+"""
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from camera import camera_position, look_at, perspective, NEAR_PLANE
+from cube import get_unit_cube_vertices, cube_edges, cube_faces
+from lattice import generate_lattice_lines, generate_plane_grid_lines
+from timeline import Timeline
+
+# Colours as used by LinearTransformationVisualizer
+BACKGROUND = (0.05, 0.05, 0.1)
+ORIGINAL_GRID = ((0.3, 0.3, 0.3), 0.4)
+CURRENT_GRID = ((0.6, 0.8, 1.0), 0.8)
+BASIS_COLORS = [(1.0, 0.3, 0.3), (0.3, 1.0, 0.3), (0.3, 0.3, 1.0)]
+ORIGINAL_CUBE = (0.8, 0.8, 0.8)
+CURRENT_CUBE = ((1.0, 0.6, 0.2), 0.8)
+WHITE = (1.0, 1.0, 1.0)
+EDGE_SHADE = 0.7
+
+
+class Canvas:
+    """RGB float image with alpha-blended line, triangle and point rasterization"""
+
+    def __init__(self, width, height, background=BACKGROUND):
+        self.width = width
+        self.height = height
+        self.image = np.empty((height, width, 3), dtype=np.float32)
+        self.image[:] = background
+
+    def blend(self, xs, ys, color, alpha=1.0):
+        """Blend a colour into a set of pixels, each pixel at most once"""
+        index = np.unique(ys * self.width + xs)
+        pixels = self.image.reshape(-1, 3)
+        pixels[index] = pixels[index] * (1.0 - alpha) + np.asarray(color, dtype=np.float32) * alpha
+
+    def lines(self, start, end, color, alpha=1.0, width=1):
+        """Rasterize (N, 2) screen-space segments, clipped to the canvas"""
+        start = np.asarray(start, dtype=float).reshape(-1, 2)
+        delta = np.asarray(end, dtype=float).reshape(-1, 2) - start
+
+        # Liang-Barsky clipping against the canvas rectangle
+        t0 = np.zeros(len(start))
+        t1 = np.ones(len(start))
+        keep = np.ones(len(start), dtype=bool)
+        limits = [
+            (-delta[:, 0], start[:, 0]),
+            (delta[:, 0], self.width - 1 - start[:, 0]),
+            (-delta[:, 1], start[:, 1]),
+            (delta[:, 1], self.height - 1 - start[:, 1]),
+        ]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for p, q in limits:
+                keep &= ~((p == 0) & (q < 0))
+                r = q / p
+                t0 = np.where(p < 0, np.maximum(t0, r), t0)
+                t1 = np.where(p > 0, np.minimum(t1, r), t1)
+        keep &= t0 <= t1
+        if not keep.any():
+            return
+
+        a = start[keep] + t0[keep, None] * delta[keep]
+        b = start[keep] + t1[keep, None] * delta[keep]
+
+        # One sample per pixel step along the longer axis of each segment
+        steps = np.ceil(np.abs(b - a).max(axis=1)).astype(int) + 1
+        segment = np.repeat(np.arange(len(a)), steps)
+        first = np.repeat(np.cumsum(steps) - steps, steps)
+        s = (np.arange(steps.sum()) - first) / np.maximum(np.repeat(steps - 1, steps), 1)
+        points = a[segment] + s[:, None] * (b - a)[segment]
+
+        xs = np.rint(points[:, 0]).astype(int)
+        ys = np.rint(points[:, 1]).astype(int)
+        if width > 1:
+            xs = np.concatenate([xs, np.minimum(xs + 1, self.width - 1), xs])
+            ys = np.concatenate([ys, ys, np.minimum(ys + 1, self.height - 1)])
+        self.blend(xs, ys, color, alpha)
+
+    def triangles(self, triangles, color, alpha=1.0):
+        """Fill (N, 3, 2) screen-space triangles"""
+        for tri in np.asarray(triangles, dtype=float).reshape(-1, 3, 2):
+            x0, y0 = np.floor(tri.min(axis=0)).astype(int)
+            x1, y1 = np.ceil(tri.max(axis=0)).astype(int)
+            x0, y0 = max(x0, 0), max(y0, 0)
+            x1, y1 = min(x1, self.width - 1), min(y1, self.height - 1)
+            if x0 > x1 or y0 > y1:
+                continue
+
+            ys, xs = np.mgrid[y0:y1 + 1, x0:x1 + 1]
+            px = xs + 0.5
+            py = ys + 0.5
+            (ax, ay), (bx, by), (cx, cy) = tri
+            area = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+            if area == 0:
+                continue
+            w0 = ((bx - px) * (cy - py) - (by - py) * (cx - px)) / area
+            w1 = ((cx - px) * (ay - py) - (cy - py) * (ax - px)) / area
+            inside = (w0 >= 0) & (w1 >= 0) & (w0 + w1 <= 1)
+            self.blend(xs[inside], ys[inside], color, alpha)
+
+    def points(self, points, color, size=1):
+        """Square points of the given pixel size"""
+        points = np.rint(np.asarray(points, dtype=float).reshape(-1, 2)).astype(int)
+        half = size // 2
+        offsets = np.arange(-half, size - half)
+        ox, oy = np.meshgrid(offsets, offsets)
+        xs = (points[:, 0, None] + ox.ravel()).ravel()
+        ys = (points[:, 1, None] + oy.ravel()).ravel()
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        self.blend(xs[inside], ys[inside], color)
+
+    def to_uint8(self):
+        return (np.clip(self.image, 0.0, 1.0) * 255 + 0.5).astype(np.uint8)
+
+
+class Scene:
+    """Geometry, keyframe matrices and camera of an offline render"""
+
+    def __init__(self, matrices, frames=120, size=(1400, 900), camera=(8, 25, 45),
+                 grid_size=8, grid_spacing=1, lattice=False, grid_density=20):
+        self.width, self.height = size
+        self.frames = frames
+
+        if lattice:
+            grid = generate_lattice_lines(grid_size, grid_spacing, grid_density)
+        else:
+            grid = generate_plane_grid_lines(grid_size, grid_spacing)
+        self.original = {
+            'cube': get_unit_cube_vertices(),
+            'basis': np.eye(3) * 2,
+            'grid': grid,
+        }
+        self.timeline = Timeline(self.original)
+        for matrix in matrices:
+            self.timeline.add_keyframe(matrix)
+
+        eye = camera_position(*camera)
+        self.mvp = perspective(aspect=self.width / self.height) @ look_at(eye)
+
+    def frame_time(self, index):
+        if self.frames <= 1:
+            return self.timeline.duration
+        return index / (self.frames - 1) * self.timeline.duration
+
+    def clip(self, points):
+        """Homogeneous clip-space coordinates of (..., 3) points"""
+        points = np.asarray(points, dtype=float)
+        return points @ self.mvp[:, :3].T + self.mvp[:, 3]
+
+    def to_screen(self, clip):
+        """Perspective divide and viewport transform to pixel coordinates"""
+        ndc = clip[..., :2] / clip[..., 3:4]
+        x = (ndc[..., 0] + 1) * 0.5 * self.width
+        y = (1 - ndc[..., 1]) * 0.5 * self.height
+        return np.stack([x, y], axis=-1)
+
+    def project_segments(self, start, end):
+        """Project segments to the screen, clipping them against the near plane"""
+        a = self.clip(start)
+        b = self.clip(end)
+        # Distance in front of the near plane; clip space keeps z >= -w
+        da = a[:, 2] + a[:, 3]
+        db = b[:, 2] + b[:, 3]
+        keep = (da >= 0) | (db >= 0)
+        a, b, da, db = a[keep], b[keep], da[keep], db[keep]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = da / (da - db)
+        crossing = a + t[:, None] * (b - a)
+        a = np.where((da < 0)[:, None], crossing, a)
+        b = np.where((db < 0)[:, None], crossing, b)
+        return self.to_screen(a), self.to_screen(b)
+
+    def project_points(self, points):
+        """Project points, dropping those behind the near plane"""
+        clip = self.clip(points)
+        return self.to_screen(clip[clip[:, 3] > NEAR_PLANE])
+
+    def draw_lines(self, canvas, segments, color, alpha=1.0, width=1):
+        segments = np.asarray(segments).reshape(-1, 2, 3)
+        start, end = self.project_segments(segments[:, 0], segments[:, 1])
+        canvas.lines(start, end, color, alpha, width)
+
+    def draw_cube(self, canvas, vertices, color, alpha=0.7, wireframe=False):
+        """Faces, edges and corners of a cube, as LinearTransformationVisualizer.draw_cube"""
+        if not wireframe:
+            clip = self.clip(vertices)
+            screen = self.to_screen(clip)
+            for face in cube_faces:
+                if (clip[face, 3] <= NEAR_PLANE).any():
+                    continue
+                a, b, c, d = screen[face]
+                canvas.triangles([[a, b, c], [a, c, d]], color, alpha)
+        edge_color = tuple(channel * EDGE_SHADE for channel in color)
+        self.draw_lines(canvas, vertices[cube_edges], edge_color, width=2)
+        canvas.points(self.project_points(vertices), WHITE, size=4)
+
+    def render(self, index):
+        """Rasterize one frame and return it as an (H, W, 3) uint8 image"""
+        t = self.frame_time(index)
+        current = self.timeline.seek(t)
+        matrix = self.timeline.matrix_at(t)
+        canvas = Canvas(self.width, self.height)
+
+        # Grid: original (faded) then current
+        self.draw_lines(canvas, self.original['grid'], *ORIGINAL_GRID)
+        self.draw_lines(canvas, current['grid'], *CURRENT_GRID)
+
+        # Basis vectors and origin
+        for tip, color in zip(current['basis'], BASIS_COLORS):
+            self.draw_lines(canvas, [[0, 0, 0], tip], color, width=2)
+        canvas.points(self.project_points(np.zeros((1, 3))), WHITE, size=8)
+
+        # Original cube as wireframe once the space has moved, then the current cube
+        if not np.allclose(matrix, np.eye(3)):
+            self.draw_cube(canvas, self.original['cube'], ORIGINAL_CUBE, alpha=0.3, wireframe=True)
+        self.draw_cube(canvas, current['cube'], CURRENT_CUBE[0], alpha=CURRENT_CUBE[1])
+
+        return canvas.to_uint8()
+
+
+def write_png(path, image):
+    """Write an (H, W, 3) uint8 image as a PNG using only the standard library"""
+    height, width, _ = image.shape
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)  # Leading 0 = no filter
+    rows[:, 1:] = image.reshape(height, -1)
+
+    def chunk(tag, data):
+        return (struct.pack(">I", len(data)) + tag + data
+                + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+def write_raw(path, image):
+    """Write raw interleaved RGB bytes, top row first"""
+    with open(path, "wb") as f:
+        f.write(image.tobytes())
+
+
+WRITERS = {"png": write_png, "raw": write_raw}
+EXTENSIONS = {"png": "png", "raw": "rgb"}
+
+# Scene of the current worker process, set once by the pool initializer
+_worker_scene = None
+
+
+def _init_worker(scene):
+    global _worker_scene
+    _worker_scene = scene
+
+
+def _render_to_file(index, output_dir, fmt):
+    path = os.path.join(output_dir, f"frame_{index:05d}.{EXTENSIONS[fmt]}")
+    WRITERS[fmt](path, _worker_scene.render(index))
+    return path
+
+
+def export_animation(matrices, output_dir, frames=120, fmt="png", workers=None, **scene_options):
+    """Render an animation through the given keyframe matrices to numbered image files
+
+    scene_options are passed to Scene (size, camera, grid_size, grid_spacing,
+    lattice, grid_density). Returns the written paths in frame order.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown frame format: {fmt}")
+    os.makedirs(output_dir, exist_ok=True)
+    scene = Scene(matrices, frames=frames, **scene_options)
+
+    if workers == 1:
+        _init_worker(scene)
+        return [_render_to_file(i, output_dir, fmt) for i in range(frames)]
+
+    # Spawn so workers never inherit a GL context from a running visualizer
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(workers, mp_context=context,
+                                                initializer=_init_worker, initargs=(scene,)) as pool:
+        return list(pool.map(_render_to_file, range(frames), [output_dir] * frames, [fmt] * frames,
+                             chunksize=max(1, frames // (4 * workers))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a transformation animation to image files")
+    parser.add_argument("--matrix", type=float, nargs=9, action="append", metavar="A",
+                        help="Keyframe matrix in row-major order; repeat for a sequence")
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--output", default="frames")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="png")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--size", type=int, nargs=2, default=[1400, 900], metavar=("W", "H"))
+    parser.add_argument("--camera", type=float, nargs=3, default=[8, 25, 45],
+                        metavar=("DISTANCE", "ANGLE_X", "ANGLE_Y"))
+    parser.add_argument("--grid-size", type=int, default=8)
+    parser.add_argument("--grid-spacing", type=int, default=1)
+    parser.add_argument("--lattice", action="store_true")
+    args = parser.parse_args()
+
+    matrices = [np.array(m).reshape(3, 3) for m in (args.matrix or [[1, 0.5, 0, 0, 1, 0, 0, 0, 1]])]
+    paths = export_animation(matrices, args.output, frames=args.frames, fmt=args.format,
+                             workers=args.workers, size=tuple(args.size), camera=tuple(args.camera),
+                             grid_size=args.grid_size, grid_spacing=args.grid_spacing,
+                             lattice=args.lattice)
+    print(f"Wrote {len(paths)} frames to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 from cube import get_unit_cube_vertices, cube_edges
 from transform import apply_matrix, interpolate_vertices
 from draw import draw_cube
+from analysis import analyze
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
@@ -24,11 +25,13 @@ def main():
         [0, 0, 1]
     ])
 
-    determinant = np.linalg.det(transformation_matrix)
+    determinant = analyze(transformation_matrix).determinant
     print(f"Determinant (volume scaling factor): {determinant:.2f}")
 
     transformed = apply_matrix(transformation_matrix, original)
 
+    current = original.copy()
+
     clock = pygame.time.Clock()
     t = 0.0
     running = True
@@ -41,7 +44,7 @@ def main():
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
         t = min(t + 0.01, 1.0)
-        current = interpolate_vertices(original, transformed, t)
+        interpolate_vertices(original, transformed, t, out=current)
 
         draw_cube(original, cube_edges, color=(0.5, 0.5, 0.5))   # original (gray)
         draw_cube(current, cube_edges, color=(1, 0, 0))         # transformed (red)
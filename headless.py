@@ -0,0 +1,294 @@
+"""Headless frame-loop benchmark for LinearTransformationVisualizer
+
+Drives the body of run() for a number of scripted frames without a window and
+reports per-phase frame times and GL call counts as JSON. Frames are rendered
+either into a software GL context (SDL offscreen + Mesa) or through a recording
+backend that counts GL calls and discards them.
+
+    python headless.py --frames 300 --grid-sizes 8 16 32 --backend auto
+"""
+import argparse
+import collections
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# With no display, an offscreen SDL window needs PyOpenGL to talk to EGL
+if not os.environ.get("DISPLAY"):
+    os.environ.setdefault("SDL_VIDEODRIVER", "offscreen")
+    os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Keep stdout clean for the JSON report
+
+import numpy as np
+from OpenGL import GL, GLU
+
+import main
+import renderer
+import text
+
+# main calls GL through the OpenGL modules; renderer and text star-import their GL functions
+GL_MODULES = [GL, GLU, renderer, text]
+PHASES = ["update_animation", "draw_transformed_grid", "draw_cube", "draw_info_panel"]
+
+# Scripted matrices applied in turn over the run
+SCRIPT = [
+    np.array([[1, 0.5, 0], [0, 1, 0], [0, 0, 1]]),    # shear
+    np.array([[0, -1, 0], [1, 0, 0], [0, 0, 1]]),     # rotate Z 90°
+    np.diag([2.0, 2.0, 1.0]),                         # scale XY
+    np.array([[1, 0, 0], [0, 1, 0], [1, 1, 0]]),      # singular
+    np.eye(3),                                        # reset
+]
+
+
+class GLRecorder:
+    """Counts GL calls made by the visualizer, optionally forwarding them to the real GL"""
+
+    def __init__(self, passthrough=False):
+        self.passthrough = passthrough
+        self.counts = collections.Counter()
+        self.saved = []
+
+    def wrap(self, name, func):
+        counts = self.counts
+
+        if self.passthrough:
+            def call(*args, **kwargs):
+                counts[name] += 1
+                return func(*args, **kwargs)
+        elif name.startswith("glGen"):
+            def call(*args, **kwargs):
+                counts[name] += 1
+                return 1  # Fake object name so buffers look allocated
+        else:
+            def call(*args, **kwargs):
+                counts[name] += 1
+        return call
+
+    def install(self, modules=GL_MODULES):
+        """Replace gl*/glu* functions in the given modules with counting wrappers"""
+        for module in modules:
+            for name, value in list(vars(module).items()):
+                if name.startswith("gl") and callable(value):
+                    self.saved.append((module, name, value))
+                    setattr(module, name, self.wrap(name, value))
+
+    def uninstall(self):
+        """Restore the original GL functions"""
+        for module, name, value in reversed(self.saved):
+            setattr(module, name, value)
+        self.saved = []
+
+    def reset(self):
+        self.counts.clear()
+
+    def total(self):
+        return sum(self.counts.values())
+
+
+def open_software_context(visualizer):
+    """Try to create an offscreen GL window; returns False if none is available"""
+    try:
+        visualizer.init_pygame()
+        return True
+    except Exception:
+        main.pygame.quit()
+        return False
+
+
+def percentiles(samples):
+    """p50/p95/p99/mean/max of a list of durations in milliseconds"""
+    samples = np.asarray(samples) * 1000.0
+    if len(samples) == 0:
+        return {}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "p50": round(float(p50), 4),
+        "p95": round(float(p95), 4),
+        "p99": round(float(p99), 4),
+        "mean": round(float(samples.mean()), 4),
+        "max": round(float(samples.max()), 4),
+    }
+
+
+def timed(func, samples):
+    """Wrap a method so each call adds its duration to the current frame's sample"""
+    def call(*args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        samples[-1] += time.perf_counter() - start
+        return result
+    return call
+
+
+def frame_clock(fps=60):
+    """Time source advancing 1/fps seconds per reading, so animations run as if at fps"""
+    return itertools.count(0.0, 1.0 / fps).__next__
+
+
+def scripted_visualizer(grid_size, lattice=False, animation_path="matrix"):
+    """Visualizer with the given grid and animation path whose animation runs on frame_clock"""
+    visualizer = main.LinearTransformationVisualizer()
+    visualizer.grid_size = grid_size
+    visualizer.lattice_mode = lattice
+    visualizer.animation_path = animation_path
+    visualizer.rebuild_grid()
+    visualizer.time_source = frame_clock()
+    return visualizer
+
+
+def benchmark(grid_size, frames, backend, lattice=False, frames_per_matrix=None, animation_path="matrix"):
+    """Run the scripted frame loop for one grid size and return its report"""
+    visualizer = scripted_visualizer(grid_size, lattice, animation_path)
+
+    software = backend in ("software", "auto") and open_software_context(visualizer)
+    if backend == "software" and not software:
+        raise RuntimeError("No software GL context available")
+
+    finish = GL.glFinish
+    recorder = GLRecorder(passthrough=software)
+    recorder.install()
+
+    samples = {phase: [] for phase in PHASES}
+    for phase in PHASES:
+        setattr(visualizer, phase, timed(getattr(visualizer, phase), samples[phase]))
+
+    frames_per_matrix = frames_per_matrix or max(1, frames // len(SCRIPT))
+    frame_times = []
+    try:
+        for frame in range(frames):
+            if frame % frames_per_matrix == 0:
+                visualizer.apply_transformation(SCRIPT[(frame // frames_per_matrix) % len(SCRIPT)])
+
+            for phase in PHASES:
+                samples[phase].append(0.0)
+            start = time.perf_counter()
+            visualizer.render_frame()
+            if software:
+                finish()
+            frame_times.append(time.perf_counter() - start)
+    finally:
+        recorder.uninstall()
+        if software:
+            main.pygame.quit()
+
+    return {
+        "grid_size": grid_size,
+        "lattice": lattice,
+        "animation_path": animation_path,
+        "segments": int(len(visualizer.original_grid_lines)),
+        "backend": "software" if software else "record",
+        "frames": frames,
+        "frame_ms": percentiles(frame_times),
+        "phases_ms": {phase: percentiles(samples[phase]) for phase in PHASES},
+        "gl_calls": {
+            "total": recorder.total(),
+            "per_frame": round(recorder.total() / max(frames, 1), 2),
+            "by_function": dict(recorder.counts.most_common()),
+        },
+    }
+
+
+def animation_allocations(grid_size, frames, lattice=False, animation_path="matrix"):
+    """Bytes allocated by each animating update_animation step, measured with tracemalloc
+
+    The step writes into preallocated buffers, so both numbers should stay at a
+    small constant (array views and Python floats) whatever the grid size.
+    """
+    visualizer = scripted_visualizer(grid_size, lattice, animation_path)
+
+    peaks = []
+    retained = []
+    tracemalloc.start()
+    try:
+        for frame in range(frames):
+            if not visualizer.is_animating or visualizer.transform_job is not None:
+                # Setting up an animation allocates by design; only animating steps are measured
+                visualizer.apply_transformation(SCRIPT[frame % len(SCRIPT)])
+                while visualizer.transform_job is not None:
+                    visualizer.update_animation()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            visualizer.update_animation()
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "grid_size": grid_size,
+        "frames": frames,
+        "peak_bytes_max": int(max(peaks, default=0)),
+        "retained_bytes_max": int(max(retained, default=0)),
+        "retained_bytes_total": int(sum(retained)),
+    }
+
+
+# Cold-start paths, each timed in a fresh interpreter
+STARTUP_PATHS = {
+    "compute": "import compute; compute.main(['1', '0.5', '0', '0', '1', '0', '0', '0', '1'])",
+    "visualizer": "import main; main.LinearTransformationVisualizer()",
+}
+
+
+def startup_times(runs=5):
+    """Wall-clock cold-start time of the compute and visualizer paths"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    report = {}
+    for name, code in STARTUP_PATHS.items():
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], cwd=here, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            samples.append(time.perf_counter() - start)
+        report[name] = percentiles(samples)
+    return report
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Headless frame-loop benchmark")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--grid-sizes", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--backend", choices=["auto", "software", "record"], default="auto")
+    parser.add_argument("--lattice", action="store_true", help="Benchmark the full 3D lattice")
+    parser.add_argument("--frames-per-matrix", type=int, default=None)
+    parser.add_argument("--animation-path", choices=["matrix", "vertices"], default="matrix",
+                        help="Interpolate the model matrix or every vertex")
+    parser.add_argument("--allocations", action="store_true",
+                        help="Also trace per-frame allocations of the animation step")
+    parser.add_argument("--startup", type=int, default=0, metavar="RUNS",
+                        help="Also time cold start of the compute and visualizer paths")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "results": [
+            benchmark(size, args.frames, args.backend, args.lattice, args.frames_per_matrix, args.animation_path)
+            for size in args.grid_sizes
+        ],
+    }
+    if args.startup:
+        report["startup_ms"] = startup_times(args.startup)
+    if args.allocations:
+        report["allocations"] = [
+            animation_allocations(size, args.frames, args.lattice, args.animation_path) for size in args.grid_sizes
+        ]
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main_cli()
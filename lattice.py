@@ -0,0 +1,88 @@
+import functools
+import numpy as np
+
+CHUNK_SIZE = 65536  # Line segments transformed per chunk
+
+
+def lattice_coordinates(size, spacing, density=None):
+    """Lattice positions along one axis, capped at density positions"""
+    coords = np.arange(-size, size + spacing * 0.5, spacing, dtype=np.float32)
+    if density and len(coords) > density:
+        # Keep both ends and thin out the interior evenly
+        keep = np.linspace(0, len(coords) - 1, density).round().astype(int)
+        coords = coords[keep]
+    return coords
+
+
+@functools.lru_cache(maxsize=8)
+def generate_lattice_lines(size, spacing, density=None):
+    """Lines parallel to each axis through every point of a 3D lattice
+
+    Returns a read-only float32 array of shape (3 * n * n, 2, 3), memoized per
+    (size, spacing, density).
+    """
+    coords = lattice_coordinates(size, spacing, density)
+    a, b = np.meshgrid(coords, coords, indexing='ij')
+    a = a.ravel()
+    b = b.ravel()
+    count = len(a)
+
+    lines = np.empty((3, count, 2, 3), dtype=np.float32)
+    for axis in range(3):
+        others = [i for i in range(3) if i != axis]
+        lines[axis, :, 0, axis] = -size
+        lines[axis, :, 1, axis] = size
+        lines[axis, :, :, others[0]] = a[:, None]
+        lines[axis, :, :, others[1]] = b[:, None]
+
+    lines = lines.reshape(-1, 2, 3)
+    lines.flags.writeable = False
+    return lines
+
+
+def generate_plane_grid_lines(size, spacing):
+    """Grid lines in the XY, XZ and YZ coordinate planes, shape (6 * n, 2, 3)"""
+    coords = np.arange(-size, size + 1, spacing, dtype=float)
+    n = len(coords)
+    lines = np.zeros((3, n, 2, 2, 3))
+
+    # Axes spanning each plane; each family holds one of them fixed at i
+    planes = [(0, 1), (0, 2), (1, 2)]
+    for p, (u, v) in enumerate(planes):
+        # First family: u = i, v runs from -size to size
+        lines[p, :, 0, :, u] = coords[:, None]
+        lines[p, :, 0, 0, v] = -size
+        lines[p, :, 0, 1, v] = size
+        # Second family: v = i, u runs from -size to size
+        lines[p, :, 1, :, v] = coords[:, None]
+        lines[p, :, 1, 0, u] = -size
+        lines[p, :, 1, 1, u] = size
+    return lines.reshape(-1, 2, 3)
+
+
+def allocate_output(shape, memmap_path=None):
+    """Allocate a float32 output buffer, memory-mapped to a file when a path is given"""
+    if memmap_path is None:
+        return np.empty(shape, dtype=np.float32)
+    return np.lib.format.open_memmap(memmap_path, mode='w+', dtype=np.float32, shape=shape)
+
+
+def transform_chunks(matrix, vertices, out, chunk_size=CHUNK_SIZE):
+    """Transform vertices into out in fixed-size chunks, yielding progress after each one"""
+    matrix_t = np.ascontiguousarray(np.asarray(matrix, dtype=np.float32).T)
+    total = len(vertices)
+    if total == 0:
+        yield 1.0
+        return
+    for start in range(0, total, chunk_size):
+        end = min(start + chunk_size, total)
+        np.matmul(vertices[start:end], matrix_t, out=out[start:end])
+        yield end / total
+
+
+def transform_chunked(matrix, vertices, chunk_size=CHUNK_SIZE, memmap_path=None):
+    """Transform vertices chunk by chunk and return the filled float32 buffer"""
+    out = allocate_output(vertices.shape, memmap_path)
+    for _ in transform_chunks(matrix, vertices, out, chunk_size):
+        pass
+    return out
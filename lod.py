@@ -0,0 +1,121 @@
+import math
+import numpy as np
+
+from camera import FIELD_OF_VIEW
+
+LOD_LEVELS = 4            # Level k keeps every 2**k-th grid line
+LOD_MIN_SPACING_PX = 24   # Coarsen until neighbouring lines are at least this far apart on screen
+LOD_MAX_SEGMENTS = 100000 # Coarsen while more segments than this would survive culling
+LOD_CHUNK_LINES = 1024    # Lines per culling chunk
+
+
+def line_levels(lines, count=LOD_LEVELS):
+    """Indices of progressively sparser subsets of axis-aligned grid lines
+
+    A line's fixed coordinates (the axes on which both endpoints agree) are
+    ranked per axis from the one nearest the origin; level k keeps the lines
+    whose ranks are all multiples of 2**k, so the axes through the origin
+    survive at every level.
+    """
+    lines = np.asarray(lines).reshape(-1, 2, 3)
+    start, end = lines[:, 0], lines[:, 1]
+    fixed = start == end
+
+    offsets = np.zeros(start.shape, dtype=np.int64)
+    for axis in range(3):
+        values = start[fixed[:, axis], axis]
+        if len(values) == 0:
+            continue
+        coords = np.unique(values)
+        center = np.abs(coords).argmin()
+        offsets[fixed[:, axis], axis] = np.searchsorted(coords, values) - center
+
+    return [np.flatnonzero((offsets % (1 << k) == 0).all(axis=1)) for k in range(count)]
+
+
+def select_level(distance, spacing, viewport_height, count=LOD_LEVELS,
+                 fovy=FIELD_OF_VIEW, min_spacing_px=LOD_MIN_SPACING_PX):
+    """Finest level whose line spacing, seen from distance, is at least min_spacing_px"""
+    focal = viewport_height / 2 / math.tan(math.radians(fovy) / 2)
+    pixels = spacing * focal / max(distance, 1e-6)
+    if pixels <= 0:
+        return count - 1
+    level = math.ceil(math.log2(min_spacing_px / pixels))
+    return min(max(level, 0), count - 1)
+
+
+def visible_segments(segments, mvp):
+    """Mask of (N, k, 3) segments (k = 2) or box corners (k = 8) not entirely outside one frustum plane
+
+    Conservative: a segment or box that crosses a frustum corner may be kept
+    even though no part of it is on screen.
+    """
+    clip = segments @ mvp[:, :3].T.astype(segments.dtype) + mvp[:, 3].astype(segments.dtype)
+    w = clip[..., 3:]
+    xyz = clip[..., :3]
+    # Both endpoints beyond the same plane, for each of the six planes
+    outside = (xyz < -w).all(axis=1) | (xyz > w).all(axis=1)
+    return ~outside.any(axis=1)
+
+
+def segment_elements(lines):
+    """Vertex indices (two per segment) for drawing the given line indices with glDrawElements"""
+    lines = np.asarray(lines, dtype=np.uint32) * 2
+    return np.stack([lines, lines + 1], axis=1).ravel()
+
+
+class LineChunks:
+    """One LOD level's lines in spatially compact chunks, culled chunk by chunk
+
+    Lines are sorted by the coarse cell their midpoint falls in and cut into
+    runs of up to chunk_lines, each with the corners of its bounding box.
+    Because the boxes are in untransformed coordinates and every frustum
+    plane test is linear, a box culled against mvp @ model safely stands for
+    all of its lines under any linear model matrix.
+    """
+
+    def __init__(self, lines, subset, chunk_lines=LOD_CHUNK_LINES):
+        subset = np.asarray(subset, dtype=np.int64)
+        segments = np.asarray(lines).reshape(-1, 2, 3)[subset]
+        count = len(subset)
+
+        cells = max(1, round((count / chunk_lines) ** (1 / 3)))
+        middle = segments.mean(axis=1)
+        low, high = middle.min(axis=0), middle.max(axis=0)
+        coords = np.floor((middle - low) / np.maximum(high - low, 1e-12) * (cells - 1e-9)).astype(np.int64)
+        order = np.argsort((coords[:, 0] * cells + coords[:, 1]) * cells + coords[:, 2], kind='stable')
+        segments = segments[order]
+
+        self.elements = segment_elements(subset[order])
+        starts = np.arange(0, count, chunk_lines)
+        self.lines = np.diff(np.append(starts, count))  # Lines per chunk
+        self.offsets = starts * 2                       # First element of each chunk
+        if count:
+            lo = np.minimum.reduceat(segments.min(axis=1), starts)
+            hi = np.maximum.reduceat(segments.max(axis=1), starts)
+        else:
+            lo = hi = np.zeros((0, 3))
+        # Corner j of a box takes bit b of j to pick lo or hi on axis b
+        bits = (np.arange(8)[:, None] >> np.arange(3)) & 1
+        self.corners = np.where(bits, hi[:, None, :], lo[:, None, :])
+
+    def __len__(self):
+        return len(self.lines)
+
+    def visible(self, mvp):
+        """Mask of chunks not entirely outside the frustum of mvp"""
+        return visible_segments(self.corners, mvp)
+
+    def segments(self, mask):
+        """Number of lines in the chunks of mask"""
+        return int(self.lines[mask].sum())
+
+    def elements_for(self, mask):
+        """Element indices of the chunks in mask, as few slices of the sorted elements as possible"""
+        if mask.all():
+            return self.elements
+        # Runs of consecutive visible chunks become single slices
+        edges = np.flatnonzero(np.diff(np.concatenate([[False], mask, [False]]).astype(np.int8)))
+        ends = np.append(self.offsets, len(self.elements))
+        return np.concatenate([self.elements[ends[start]:ends[stop]] for start, stop in edges.reshape(-1, 2)]
+                              or [self.elements[:0]])
@@ -1,13 +1,69 @@
 import numpy as np
-import pygame
-from pygame.locals import *
-from OpenGL.GL import *
-from OpenGL.GLU import *
-import math
+import argparse
 import time
-import tkinter as tk
-from tkinter import messagebox, simpledialog, ttk
-import threading
+import multiprocessing
+import queue
+from cube import get_unit_cube_vertices
+from transform import apply_matrix, lerp_delta, homogeneous
+from lattice import (generate_lattice_lines, generate_plane_grid_lines, lattice_coordinates,
+                     allocate_output, transform_chunks)
+from timeline import Timeline
+from analysis import analyzer, analyze
+from camera import Camera, perspective, FIELD_OF_VIEW, NEAR_PLANE, FAR_PLANE
+from lod import line_levels, select_level, LineChunks, LOD_MAX_SEGMENTS
+from export import export_animation
+from mesh import load_mesh, fit_to_unit_cube
+from profiler import FrameProfiler
+from control import ControlServer
+from particles import ParticleFlow
+from picking import PointIndex, PICK_RADIUS_PX
+from session import SessionRecorder, SessionReplay
+
+# Window events that invalidate the frame on screen, set by load_graphics
+WINDOW_EVENTS = None
+
+def load_graphics():
+    """Import pygame, OpenGL and the GL renderer into this module on first use
+    
+    Only a running visualizer needs them, so scripts that import this module
+    for the math start quickly and work without a display.
+    """
+    global pygame, GL, GLU, VertexBuffer, CubeMesh, TextPanel, WINDOW_EVENTS
+    if WINDOW_EVENTS is not None:
+        return
+    
+    import pygame
+    from OpenGL import GL, GLU
+    from renderer import VertexBuffer, CubeMesh
+    from text import TextPanel
+    
+    WINDOW_EVENTS = (
+        pygame.VIDEOEXPOSE, pygame.VIDEORESIZE, pygame.ACTIVEEVENT,
+        pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN, pygame.WINDOWRESTORED, pygame.WINDOWSIZECHANGED,
+    )
+
+# Preset transformations offered by the matrix editor
+PRESETS = [
+    ("Identity", np.eye(3)),
+    ("Scale 2x", np.diag([2, 2, 2])),
+    ("Scale XY", np.diag([2, 2, 1])),
+    ("Rotate Z 90°", np.array([[0, -1, 0], [1, 0, 0], [0, 0, 1]])),
+    ("Rotate Y 90°", np.array([[0, 0, 1], [0, 1, 0], [-1, 0, 0]])),
+    ("Rotate X 90°", np.array([[1, 0, 0], [0, 0, -1], [0, 1, 0]])),
+    ("Shear X", np.array([[1, 0.5, 0], [0, 1, 0], [0, 0, 1]])),
+    ("Shear Y", np.array([[1, 0, 0], [0.5, 1, 0], [0, 0, 1]])),
+    ("Reflect X", np.array([[-1, 0, 0], [0, 1, 0], [0, 0, 1]])),
+]
+
+# Instance colours in the overlaid comparison layout
+COMPARISON_COLORS = [
+    (1.0, 0.6, 0.2),
+    (0.3, 0.8, 1.0),
+    (0.5, 1.0, 0.4),
+    (1.0, 0.4, 0.8),
+    (1.0, 0.9, 0.3),
+    (0.7, 0.5, 1.0),
+]
 
 class MatrixInputGUI:
     def __init__(self, callback):
@@ -17,6 +73,11 @@ class MatrixInputGUI:
         
     def create_gui(self):
         """Create the matrix input GUI"""
+        import tkinter as tk
+        from tkinter import ttk
+        
+        analyzer.precompute(matrix for _, matrix in PRESETS)
+        
         self.root = tk.Tk()
         self.root.title("Linear Transformation Matrix Input")
         self.root.geometry("500x400")
@@ -53,19 +114,7 @@ class MatrixInputGUI:
                  font=("Arial", 12, "bold")).grid(row=0, column=0, columnspan=3, pady=(0, 10))
         
         # Preset buttons
-        presets = [
-            ("Identity", np.eye(3)),
-            ("Scale 2x", np.diag([2, 2, 2])),
-            ("Scale XY", np.diag([2, 2, 1])),
-            ("Rotate Z 90°", np.array([[0, -1, 0], [1, 0, 0], [0, 0, 1]])),
-            ("Rotate Y 90°", np.array([[0, 0, 1], [0, 1, 0], [-1, 0, 0]])),
-            ("Rotate X 90°", np.array([[1, 0, 0], [0, 0, -1], [0, 1, 0]])),
-            ("Shear X", np.array([[1, 0.5, 0], [0, 1, 0], [0, 0, 1]])),
-            ("Shear Y", np.array([[1, 0, 0], [0.5, 1, 0], [0, 0, 1]])),
-            ("Reflect X", np.array([[-1, 0, 0], [0, 1, 0], [0, 0, 1]])),
-        ]
-        
-        for idx, (name, matrix) in enumerate(presets):
+        for idx, (name, matrix) in enumerate(PRESETS):
             row = idx // 3 + 1
             col = idx % 3
             btn = ttk.Button(preset_frame, text=name, 
@@ -101,6 +150,8 @@ class MatrixInputGUI:
         
     def set_matrix(self, matrix):
         """Set the matrix values in the GUI"""
+        import tkinter as tk
+        
         for i in range(3):
             for j in range(3):
                 self.entries[i][j].delete(0, tk.END)
@@ -112,6 +163,8 @@ class MatrixInputGUI:
     
     def apply_matrix(self):
         """Apply the current matrix"""
+        from tkinter import messagebox
+        
         try:
             matrix = np.zeros((3, 3))
             for i in range(3):
@@ -120,7 +173,7 @@ class MatrixInputGUI:
                     matrix[i, j] = value
             
             # Check if matrix is invertible
-            det = np.linalg.det(matrix)
+            det = analyze(matrix).determinant
             if abs(det) < 1e-10:
                 messagebox.showwarning("Warning", 
                     f"Matrix is not invertible (determinant = {det:.6f})\n"
@@ -143,349 +196,1237 @@ class MatrixInputGUI:
         """Show the GUI"""
         self.create_gui()
         self.root.mainloop()
+        
+    def poll_commands(self, commands, interval_ms=100):
+        """Handle 'raise' and 'close' requests sent from the visualizer process"""
+        try:
+            while True:
+                command = commands.get_nowait()
+                if command == 'raise':
+                    self.root.deiconify()
+                    self.root.lift()
+                    self.root.focus_force()
+                elif command == 'close':
+                    self.close_gui()
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(interval_ms, self.poll_commands, commands, interval_ms)
+
+def run_matrix_gui(matrices, commands):
+    """Entry point of the editor process: submitted matrices go onto the matrices queue"""
+    gui = MatrixInputGUI(matrices.put)
+    gui.create_gui()
+    gui.poll_commands(commands)
+    gui.root.mainloop()
+
+class MatrixEditor:
+    """Matrix input GUI running in its own process
+
+    Submissions travel back over a queue and are coalesced, so the render loop
+    applies only the newest matrix at the start of a frame and never shares
+    state with the Tk mainloop.
+    """
+    
+    def __init__(self):
+        # Spawn rather than fork so the child does not inherit the SDL/GL state
+        self.context = multiprocessing.get_context('spawn')
+        self.matrices = self.context.Queue()
+        self.commands = self.context.Queue()
+        self.process = None
+        
+    def is_open(self):
+        return self.process is not None and self.process.is_alive()
+        
+    def show(self):
+        """Open the editor, or bring the existing window to the front"""
+        if self.is_open():
+            self.commands.put('raise')
+            return
+        self.process = self.context.Process(target=run_matrix_gui, args=(self.matrices, self.commands),
+                                            daemon=True)
+        self.process.start()
+        
+    def latest_matrix(self):
+        """Drain pending submissions and return only the newest, or None"""
+        latest = None
+        while True:
+            try:
+                latest = self.matrices.get_nowait()
+            except queue.Empty:
+                return latest
+                
+    def close(self):
+        """Ask the editor to close, terminating it if it does not exit promptly"""
+        if not self.is_open():
+            return
+        self.commands.put('close')
+        self.process.join(timeout=1.0)
+        if self.process.is_alive():
+            self.process.terminate()
 
 class LinearTransformationVisualizer:
     def __init__(self):
+        load_graphics()
+        
         self.width = 1400
         self.height = 900
-        self.camera_distance = 8
-        self.camera_angle_x = 25
-        self.camera_angle_y = 45
-        self.animation_speed = 0.015
+        self.camera = Camera(distance=8, angle_x=25, angle_y=45, aspect=self.width / self.height)
+        self.animation_duration = 1.1  # Seconds per transition (and per timeline segment)
         self.animation_progress = 0
         self.is_animating = False
         
+        # Animation follows this clock rather than the frame count; a long stall advances at most max_animation_step
+        self.time_source = time.perf_counter
+        self.last_animation_time = self.time_source()
+        self.max_animation_step = 0.1
+        
+        # Frame budget: optional work is shed step by step while frames run late
+        self.frame_budget_ms = 1000 / 60
+        self.frame_load_ms = 0.0  # render_frame time, smoothed over about frame_load_window_s of wall-clock time
+        self.frame_load_window_s = 0.1
+        self.frame_load_time = None  # perf_counter time of the last measured frame
+        self.load_shedding = 0    # 1 drops the original grid, 2 and up also coarsen the grid LOD
+        self.max_load_shedding = 3
+        self.load_shedding_hold_s = 0.5    # Wall-clock time to keep a level before changing it again
+        self.load_shedding_until = 0.0     # perf_counter time the current level is held until
+        
         # Unit cube in first octant (from origin to (1,1,1))
-        self.original_cube = np.array([
-            [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],  # bottom face
-            [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]   # top face
-        ])
+        self.original_cube = get_unit_cube_vertices()
         
         self.transformed_cube = self.original_cube.copy()
         self.current_cube = self.original_cube.copy()
         
-        # Transformation matrix
+        # Per-vertex displacement from original to transformed, set up by prepare_animation
+        self.delta_cube = np.zeros_like(self.original_cube)
+        
+        # 'matrix' interpolates only the 3x3 model matrix and lets GL transform the untransformed
+        # buffers; 'vertices' interpolates every vertex on the CPU (used by the timeline's geometry cache)
+        self.animation_path = 'matrix'
+        self.original_matrix = np.eye(3)
+        self.delta_matrix = np.zeros((3, 3))
+        self.current_matrix = np.eye(3)
+        
+        # Transformation matrix and its cached analysis
+        analyzer.precompute(matrix for _, matrix in PRESETS)
         self.transform_matrix = np.eye(3)
+        self.analysis = analyze(self.transform_matrix)
         self.original_determinant = 1.0
         self.transformed_determinant = 1.0
+        self.show_invariant_axes = False
         
         # Grid parameters
         self.grid_size = 8
         self.grid_spacing = 1
         self.grid_density = 20  # Number of grid lines
         
+        # Volumetric lattice mode: grid is transformed in chunks across frames
+        self.lattice_mode = False
+        self.lattice_chunks_per_frame = 4
+        self.lattice_memmap_path = None  # Set to a file path to back the transformed lattice with a memmap
+        self.transform_job = None
+        
         # Original and transformed grid lines
         self.original_grid_lines = self.generate_grid_lines()
         self.transformed_grid_lines = self.original_grid_lines.copy()
         self.current_grid_lines = self.original_grid_lines.copy()
+        self.delta_grid_lines = np.zeros_like(self.original_grid_lines)
+        
+        # Grid level of detail: sparser line subsets picked by camera distance and visible segment
+        # count, frustum culled chunk by chunk; results are cached until the camera or matrix changes
+        self.grid_lod_chunks = self.lod_chunks()
+        self.grid_line_spacing = self.base_line_spacing()
+        self.grid_extent = self.line_extent(self.original_grid_lines)
+        self.grid_segment_budget = LOD_MAX_SEGMENTS
+        self.grid_element_cache = {}
+        self.grid_lod_level = 0
+        self.grid_segments_drawn = 0
         
         # Original basis vectors
         self.original_basis = np.array([
             [2, 0, 0],  # x-axis (red) - made longer for visibility
             [0, 2, 0],  # y-axis (green)
             [0, 0, 2]   # z-axis (blue)
-        ])
+        ], dtype=float)
         
         self.transformed_basis = self.original_basis.copy()
         self.current_basis = self.original_basis.copy()
-        
-        # Mouse interaction
+        self.delta_basis = np.zeros_like(self.original_basis)
+        
+        # Optional mesh loaded from an OBJ/PLY file (see load_mesh_file)
+        self.mesh = None
+        self.mesh_path = None
+        self.mesh_buffer = None
+        
+        # Particle flow under the current matrix (see set_particle_mode)
+        self.particles = None
+        self.particle_buffer = None
+        self.particle_count = 50000
+        
+        # Hover picking over grid endpoints and cube corners, indexed untransformed once per grid
+        self.hover = None  # Index into pick_index.points
+        self.hover_point = None  # The hovered point under current_matrix
+        self.hover_pending = False
+        self.rebuild_pick_index()
+        
+        # Keyframe timeline of chained transformations
+        self.timeline = Timeline(*self.timeline_geometry())
+        self.timeline_active = False
+        self.timeline_seek_step = 0.1
+        
+        # Retained vertex buffers for the scene
+        self.original_grid_buffer = VertexBuffer(self.original_grid_lines, usage=GL.GL_STATIC_DRAW)
+        self.current_grid_buffer = VertexBuffer(self.current_grid_lines)
+        self.basis_segment_vertices = self.basis_segments(self.current_basis)
+        basis_colors = np.repeat([
+            [1.0, 0.3, 0.3],  # x-axis (red)
+            [0.3, 1.0, 0.3],  # y-axis (green)
+            [0.3, 0.3, 1.0]   # z-axis (blue)
+        ], 2, axis=0)
+        self.basis_buffer = VertexBuffer(self.basis_segment_vertices, colors=basis_colors)
+        self.original_basis_buffer = VertexBuffer(self.basis_segments(self.original_basis), colors=basis_colors,
+                                                  usage=GL.GL_STATIC_DRAW)
+        self.axes_buffer = VertexBuffer(self.invariant_axis_segments(self.analysis))
+        self.origin_buffer = VertexBuffer(np.zeros((1, 3)), mode=GL.GL_POINTS, usage=GL.GL_STATIC_DRAW)
+        self.original_cube_mesh = CubeMesh(self.original_cube)
+        self.current_cube_mesh = CubeMesh(self.current_cube)
+        self.hover_buffer = VertexBuffer(np.zeros((1, 3)), mode=GL.GL_POINTS)
+        
+        # Comparison mode: several matrices drawn as instances of the untransformed geometry
+        self.comparison_matrices = []
+        self.comparison_layout = 'tiled'  # or 'overlay'
+        
+        # Redraw tracking: the loop sleeps instead of rendering when nothing changed
+        self.needs_redraw = True
+        self.idle_timeout_ms = 500
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+        
+        # Info panel text, created on first draw
+        self.text_panel = None
+        
+        # Per-phase frame timings, recorded while the HUD is shown or a trace is requested
+        self.profiler = FrameProfiler()
+        self.show_profile = False
+        self.profile_trace_path = None  # CSV or JSON file written on exit
+        
+        # Mouse interaction, accumulated over a frame and applied once by apply_camera_input
         self.mouse_drag = False
         self.last_mouse_pos = [0, 0]
-        
-        # GUI
-        self.gui = None
-        self.gui_thread = None
+        self.orbit_delta = [0, 0]
+        self.zoom_delta = 0.0
+        
+        # Matrix editor (separate process) and how often to poll it while idle
+        self.editor = MatrixEditor()
+        self.editor_poll_ms = 50
+        
+        # Optional socket control server, started by run() when an address is set
+        self.control_address = None  # "host:port", "port" or "unix:/path"
+        self.control = None
+        self.control_commands_per_frame = 32
+        
+        # Session log: run() records its inputs to record_path, or replays replay_path instead of live input
+        self.record_path = None
+        self.replay_path = None
+        self.replay_fast = False  # Replay without waiting for the recorded timing or the 60 FPS cap
+        self.recorder = None
+        self.replay = None
+        self.replay_frames = None
+        self.replay_frame = None
+        self.replay_start = 0.0
         
     def generate_grid_lines(self):
         """Generate grid lines for the coordinate system"""
-        lines = []
-        
-        # Create a denser grid to show space transformation
-        grid_range = self.grid_size
-        step = self.grid_spacing
-        
-        # XY plane lines
-        for i in range(-grid_range, grid_range + 1, step):
-            # Lines parallel to X axis
-            lines.append([[i, -grid_range, 0], [i, grid_range, 0]])
-            # Lines parallel to Y axis  
-            lines.append([[-grid_range, i, 0], [grid_range, i, 0]])
-        
-        # XZ plane lines
-        for i in range(-grid_range, grid_range + 1, step):
-            # Lines parallel to X axis
-            lines.append([[i, 0, -grid_range], [i, 0, grid_range]])
-            # Lines parallel to Z axis
-            lines.append([[-grid_range, 0, i], [grid_range, 0, i]])
-        
-        # YZ plane lines
-        for i in range(-grid_range, grid_range + 1, step):
-            # Lines parallel to Y axis
-            lines.append([[0, i, -grid_range], [0, i, grid_range]])
-            # Lines parallel to Z axis
-            lines.append([[0, -grid_range, i], [0, grid_range, i]])
-        
-        return np.array(lines)
+        if self.lattice_mode:
+            return generate_lattice_lines(self.grid_size, self.grid_spacing, self.grid_density)
+        
+        # Lines in the XY, XZ and YZ planes
+        return generate_plane_grid_lines(self.grid_size, self.grid_spacing)
+    
+    def base_line_spacing(self):
+        """Distance between neighbouring untransformed grid lines"""
+        if not self.lattice_mode:
+            return self.grid_spacing
+        coords = lattice_coordinates(self.grid_size, self.grid_spacing, self.grid_density)
+        return float(coords[-1] - coords[0]) / max(len(coords) - 1, 1)
+    
+    def lod_chunks(self):
+        """Culling chunks of each LOD level of the original grid"""
+        return [LineChunks(self.original_grid_lines, subset) for subset in line_levels(self.original_grid_lines)]
+        
+    def line_extent(self, lines):
+        """Largest coordinate of the lines relative to the grid size"""
+        return float(np.abs(lines).max()) / self.grid_size if len(lines) else 1.0
+        
+    def basis_segments(self, basis, out=None):
+        """Origin-to-tip line segments for the basis vectors"""
+        segments = np.zeros((len(basis) * 2, 3)) if out is None else out
+        segments[1::2] = basis
+        return segments
+    
+    def timeline_geometry(self):
+        """Original geometry for the timeline and the current_* buffers it writes into"""
+        if self.animation_path == 'matrix':
+            # Only the matrix is interpolated, so the timeline has no geometry to transform
+            return {}, {}
+        original = {'cube': self.original_cube, 'basis': self.original_basis, 'grid': self.original_grid_lines}
+        current = {'cube': self.current_cube, 'basis': self.current_basis, 'grid': self.current_grid_lines}
+        if self.mesh is not None:
+            original['mesh'] = self.original_mesh
+            current['mesh'] = self.current_mesh
+        return original, current
+        
+    def show_timeline(self):
+        """Display the timeline's current time"""
+        self.mark_dirty()
+        self.transform_matrix = self.timeline.matrix_at(self.timeline.time)
+        self.current_matrix[...] = self.transform_matrix
+        self.analysis = analyze(self.transform_matrix)
+        self.transformed_determinant = self.analysis.determinant
+        self.axes_buffer.update(self.invariant_axis_segments(self.analysis))
+        self.move_hover()
+        if not self.timeline.playing:
+            # Re-pick once the geometry stops under the cursor
+            self.hover_pending = True
+        self.sync_buffers()
+        
+    def seek_timeline(self, t):
+        """Jump the timeline to time t (in keyframe segments) and show it"""
+        if not self.timeline.matrices:
+            return
+        self.is_animating = False
+        self.timeline_active = True
+        self.timeline.seek(t)
+        self.show_timeline()
+        
+    def toggle_timeline(self):
+        """Play or pause the keyframe timeline"""
+        if not self.timeline.matrices:
+            return
+        if not self.timeline_active:
+            self.seek_timeline(0.0)
+        self.timeline.toggle()
+        if self.timeline.playing:
+            # Step from now, not from whenever the loop last animated
+            self.last_animation_time = self.time_source()
+        else:
+            self.hover_pending = True
+        
+    def set_comparison(self, matrices, layout=None):
+        """Show each matrix side by side (tiled) or on top of each other (overlay); [] ends comparison"""
+        self.comparison_matrices = [np.asarray(m, dtype=float).reshape(3, 3) for m in matrices]
+        if layout is not None:
+            self.comparison_layout = layout
+        self.mark_dirty()
+        
+    def toggle_comparison(self):
+        """Compare the timeline keyframes (or just the current matrix), or leave comparison mode"""
+        if self.comparison_matrices:
+            self.set_comparison([])
+        else:
+            self.set_comparison(self.timeline.matrices or [self.transform_matrix])
+            
+    def comparison_tiles(self):
+        """Viewport (x, y, width, height) of each compared matrix"""
+        count = len(self.comparison_matrices)
+        if self.comparison_layout != 'tiled':
+            return [(0, 0, self.width, self.height)] * count
+        columns = int(np.ceil(np.sqrt(count)))
+        rows = int(np.ceil(count / columns))
+        width, height = self.width // columns, self.height // rows
+        # GL viewports start at the bottom left; fill tiles from the top left
+        return [((i % columns) * width, self.height - (i // columns + 1) * height, width, height)
+                for i in range(count)]
+        
+    def draw_comparison(self):
+        """Draw every compared matrix from the shared static buffers with its own model matrix"""
+        overlay = self.comparison_layout != 'tiled'
+        drawn = 0
+        for i, (matrix, (x, y, width, height)) in enumerate(zip(self.comparison_matrices, self.comparison_tiles())):
+            projection = perspective(FIELD_OF_VIEW, width / height, NEAR_PLANE, FAR_PLANE)
+            GL.glViewport(x, y, width, height)
+            GL.glMatrixMode(GL.GL_PROJECTION)
+            GL.glLoadMatrixd(np.ascontiguousarray(projection.T))
+            GL.glMatrixMode(GL.GL_MODELVIEW)
+            
+            model = homogeneous(matrix)
+            GL.glPushMatrix()
+            GL.glMultMatrixd(np.ascontiguousarray(model.T))
+            
+            color = COMPARISON_COLORS[i % len(COMPARISON_COLORS)] if overlay else (1.0, 0.6, 0.2)
+            grid_color = color if overlay else (0.6, 0.8, 1.0)
+            
+            # Grid lines are culled against this instance's full transform
+            _, elements = self.grid_elements(matrix, (width, height))
+            GL.glLineWidth(1)
+            GL.glColor4f(grid_color[0], grid_color[1], grid_color[2], 0.3 if overlay else 0.8)
+            self.original_grid_buffer.draw(indices=elements)
+            drawn += len(elements) // 2
+            
+            GL.glLineWidth(2)
+            self.original_basis_buffer.draw()
+            self.draw_cube(self.original_cube_mesh, color=color, alpha=0.5 if overlay else 0.8)
+            GL.glPopMatrix()
+            
+        self.grid_segments_drawn = drawn
+        
+        # Back to the full window for the info panel
+        GL.glViewport(0, 0, self.width, self.height)
+        GL.glMatrixMode(GL.GL_PROJECTION)
+        GL.glLoadMatrixd(self.camera.gl_projection)
+        GL.glMatrixMode(GL.GL_MODELVIEW)
+        
+    def export_frames(self, output_dir, frames=120, fmt='png', workers=None):
+        """Render the timeline (or the current matrix) to image files offline with this camera and grid"""
+        matrices = self.timeline.matrices or [self.transform_matrix]
+        return export_animation(matrices, output_dir, frames=frames, fmt=fmt, workers=workers,
+                                size=(self.width, self.height),
+                                camera=(self.camera.distance, self.camera.angle_x, self.camera.angle_y),
+                                grid_size=self.grid_size, grid_spacing=self.grid_spacing,
+                                lattice=self.lattice_mode, grid_density=self.grid_density)
+        
+    def load_mesh_file(self, path):
+        """Load an OBJ/PLY mesh, fitted into the unit cube, as an extra transformed object"""
+        self.mesh = load_mesh(path)
+        self.mesh_path = path
+        self.original_mesh = fit_to_unit_cube(self.mesh.vertices)
+        self.transformed_mesh = self.original_mesh.copy()
+        self.current_mesh = self.original_mesh.copy()
+        self.delta_mesh = np.zeros_like(self.original_mesh)
+        self.mesh_edge_indices = np.ascontiguousarray(self.mesh.edges, dtype=np.uint32).ravel()
+        if self.mesh_buffer is not None:
+            self.mesh_buffer.delete()
+        self.mesh_buffer = VertexBuffer(self.current_mesh, mode=GL.GL_TRIANGLES, indices=self.mesh.faces)
+        
+        self.timeline.set_geometry(*self.timeline_geometry())
+        self.apply_transformation(self.transform_matrix)
+        
+    def set_particle_mode(self, mode):
+        """Flow particles by x -> Ax ('discrete') or exp(tA)x ('continuous'); None turns them off"""
+        self.mark_dirty()
+        if mode is None:
+            if self.particle_buffer is not None:
+                self.particle_buffer.delete()
+            self.particles = None
+            self.particle_buffer = None
+            return
+        if self.particles is None:
+            self.particles = ParticleFlow(self.particle_count, max_radius=2.0 * self.grid_size)
+            # The buffer shares the ring's memory; each step re-uploads just the slot it wrote
+            self.particle_buffer = VertexBuffer(self.particles.trails, mode=GL.GL_POINTS)
+            self.last_animation_time = self.time_source()
+        self.particles.mode = mode
+        self.particles.set_matrix(self.transform_matrix)
+        self.reseed_particles()
+        
+    def reseed_particles(self):
+        self.particles.reseed()
+        self.particle_buffer.invalidate_range(0, len(self.particle_buffer.vertices))
+        
+    def cycle_particle_mode(self):
+        """Off, continuous flow, discrete iteration, off"""
+        modes = [None, 'continuous', 'discrete']
+        current = None if self.particles is None else self.particles.mode
+        self.set_particle_mode(modes[(modes.index(current) + 1) % len(modes)])
+        
+    def advance_particles(self, elapsed):
+        """Step the particle flow and mark the ring slots it wrote for upload"""
+        count = self.particles.count
+        for slot in self.particles.advance(elapsed):
+            self.particle_buffer.invalidate_range(slot * count, (slot + 1) * count)
+        
+    def set_animation_path(self, path):
+        """Animate by interpolating the model matrix ('matrix') or every vertex ('vertices')"""
+        self.animation_path = path
+        if self.mesh_buffer is not None:
+            # The matrix path draws the untransformed mesh
+            self.mesh_buffer.update(self.original_mesh)
+        self.rebuild_grid()
+        
+    def set_lattice_mode(self, enabled):
+        """Switch between the coordinate-plane grid and the full 3D lattice"""
+        self.lattice_mode = enabled
+        self.rebuild_grid()
+        
+    def rebuild_grid(self):
+        """Regenerate the grid after its parameters change and re-apply the current matrix"""
+        self.transform_job = None
+        self.original_grid_lines = self.generate_grid_lines()
+        self.transformed_grid_lines = self.original_grid_lines.copy()
+        self.current_grid_lines = self.original_grid_lines.copy()
+        self.original_grid_buffer.update(self.original_grid_lines)
+        self.grid_lod_chunks = self.lod_chunks()
+        self.grid_line_spacing = self.base_line_spacing()
+        self.grid_extent = self.line_extent(self.original_grid_lines)
+        self.grid_element_cache.clear()
+        self.rebuild_pick_index()
+        self.timeline.set_geometry(*self.timeline_geometry())
+        self.sync_buffers()
+        self.apply_transformation(self.transform_matrix)
+        
+    def lattice_output(self):
+        """Buffer for the transformed lattice, reused while its shape still fits"""
+        out = self.transformed_grid_lines
+        wants_memmap = self.lattice_memmap_path is not None
+        if (out.shape != self.original_grid_lines.shape or out.dtype != np.float32
+                or not out.flags.writeable or isinstance(out, np.memmap) != wants_memmap):
+            out = allocate_output(self.original_grid_lines.shape, self.lattice_memmap_path)
+        return out
+        
+    def advance_transform_job(self):
+        """Transform a bounded number of lattice chunks; returns True once finished"""
+        for _ in range(self.lattice_chunks_per_frame):
+            if next(self.transform_job, None) is None:
+                self.transform_job = None
+                return True
+        return False
+        
+    def rebuild_pick_index(self):
+        """Index the untransformed grid endpoints and cube corners
+
+        Matrices never re-index: picks map the ray through current_matrix.
+        Endpoints shared by several lines (box edges, the plane grids' axes)
+        are indexed once per line, which only lets either copy be hovered.
+        """
+        self.pick_index = PointIndex(np.concatenate([self.original_grid_lines.reshape(-1, 3), self.original_cube]))
+        self.hover = None
+        self.hover_pending = True
+        
+    def update_hover(self):
+        """Pick the point under the mouse, at most once per frame and only after something moved"""
+        if not self.hover_pending or self.mouse_drag:
+            return
+        self.hover_pending = False
+        hover = None
+        if not self.comparison_matrices:
+            origin, direction = self.camera.ray(*self.last_mouse_pos, self.width, self.height)
+            focal = self.height / 2 / np.tan(np.radians(FIELD_OF_VIEW) / 2)
+            hover = self.pick_index.pick(origin, direction, PICK_RADIUS_PX / focal, self.current_matrix)
+        if hover != self.hover:
+            self.hover = hover
+            self.move_hover()
+            self.mark_dirty()
+            
+    def move_hover(self):
+        """Carry the hovered point along with current_matrix"""
+        if self.hover is None:
+            return
+        self.hover_point = self.current_matrix @ self.pick_index.points[self.hover]
+        self.hover_buffer.update(self.hover_point)
+        
+    def draw_hover(self):
+        """Mark the hovered point"""
+        if self.hover is None:
+            return
+        GL.glPointSize(10)
+        GL.glColor3f(1.0, 1.0, 0.3)
+        self.hover_buffer.draw()
+        
+    def invariant_axis_segments(self, analysis):
+        """Lines through the origin along each real eigenvector"""
+        axes = analysis.invariant_axes * self.grid_size
+        segments = np.empty((len(axes) * 2, 3))
+        segments[0::2] = -axes
+        segments[1::2] = axes
+        return segments
+        
+    def sync_buffers(self):
+        """Copy the current geometry into the vertex buffers"""
+        if self.animation_path == 'matrix':
+            # The buffers keep the untransformed geometry; only the model matrix changes
+            return
+        self.current_grid_buffer.update(self.current_grid_lines)
+        self.basis_buffer.update(self.basis_segments(self.current_basis, out=self.basis_segment_vertices))
+        self.current_cube_mesh.update(self.current_cube)
+        if self.mesh_buffer is not None:
+            self.mesh_buffer.update(self.current_mesh)
         
     def init_pygame(self):
         """Initialize Pygame and OpenGL"""
         pygame.init()
-        pygame.display.set_mode((self.width, self.height), DOUBLEBUF | OPENGL)
+        pygame.display.set_mode((self.width, self.height), pygame.DOUBLEBUF | pygame.OPENGL)
         pygame.display.set_caption("Linear Transformations Visualizer - First Octant Unit Cube")
         
         # OpenGL settings
-        glEnable(GL_DEPTH_TEST)
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        glEnable(GL_LINE_SMOOTH)
-        glHint(GL_LINE_SMOOTH_HINT, GL_NICEST)
+        GL.glEnable(GL.GL_DEPTH_TEST)
+        GL.glEnable(GL.GL_BLEND)
+        GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
+        GL.glEnable(GL.GL_LINE_SMOOTH)
+        GL.glHint(GL.GL_LINE_SMOOTH_HINT, GL.GL_NICEST)
         
         # Set background color
-        glClearColor(0.05, 0.05, 0.1, 1.0)
+        GL.glClearColor(0.05, 0.05, 0.1, 1.0)
         
         # Set up perspective
-        glMatrixMode(GL_PROJECTION)
-        gluPerspective(45, (self.width / self.height), 0.1, 50.0)
-        glMatrixMode(GL_MODELVIEW)
+        GL.glMatrixMode(GL.GL_PROJECTION)
+        GLU.gluPerspective(FIELD_OF_VIEW, (self.width / self.height), NEAR_PLANE, FAR_PLANE)
+        GL.glMatrixMode(GL.GL_MODELVIEW)
         
     def set_camera(self):
         """Set up camera position and orientation"""
-        glLoadIdentity()
+        # View matrix is only rebuilt after the camera moves
+        GL.glLoadMatrixd(self.camera.gl_view)
         
-        # Calculate camera position
-        x = self.camera_distance * math.cos(math.radians(self.camera_angle_x)) * math.sin(math.radians(self.camera_angle_y))
-        y = self.camera_distance * math.sin(math.radians(self.camera_angle_x))
-        z = self.camera_distance * math.cos(math.radians(self.camera_angle_x)) * math.cos(math.radians(self.camera_angle_y))
-        
-        gluLookAt(x, y, z, 0, 0, 0, 0, 1, 0)
+    def grid_elements(self, matrix, viewport=None):
+        """LOD level and element indices of the grid lines worth drawing with the grid transformed by matrix
+
+        The level starts from the on-screen line spacing and coarsens while more than
+        grid_segment_budget segments would survive culling. Results are cached per camera,
+        matrix, viewport (width, height; default the window) and load-shedding level.
+        """
+        width, height = viewport or (self.width, self.height)
+        key = (self.camera.version, matrix.tobytes(), width, height, self.load_shedding)
+        cached = self.grid_element_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if viewport is None:
+            view_projection = self.camera.view_projection
+        else:
+            view_projection = perspective(FIELD_OF_VIEW, width / height, NEAR_PLANE, FAR_PLANE) @ self.camera.view
+        mvp = view_projection @ homogeneous(matrix)
+        # Lines spread apart as the matrix stretches the grid, by at most its infinity norm
+        extent = self.grid_extent * float(np.abs(matrix).sum(axis=1).max())
+        count = len(self.grid_lod_chunks)
+        level = select_level(self.camera.distance, self.grid_line_spacing * extent, height, count)
+        # Under load, drop to sparser levels than the camera alone would pick
+        level = min(level + max(self.load_shedding - 1, 0), count - 1)
+        while True:
+            chunks = self.grid_lod_chunks[level]
+            visible = chunks.visible(mvp)
+            if level == count - 1 or chunks.segments(visible) <= self.grid_segment_budget:
+                break
+            level += 1
+        
+        if len(self.grid_element_cache) >= 16:
+            self.grid_element_cache.clear()
+        result = self.grid_element_cache[key] = (level, chunks.elements_for(visible))
+        return result
         
     def draw_transformed_grid(self):
         """Draw the transformed coordinate grid"""
-        glLineWidth(1)
-        
-        # Draw original grid lines (faded)
-        glColor4f(0.3, 0.3, 0.3, 0.4)
-        glBegin(GL_LINES)
-        for line in self.original_grid_lines:
-            glVertex3f(line[0][0], line[0][1], line[0][2])
-            glVertex3f(line[1][0], line[1][1], line[1][2])
-        glEnd()
-        
-        # Draw current (animating) grid lines
-        glColor4f(0.6, 0.8, 1.0, 0.8)
-        glBegin(GL_LINES)
-        for line in self.current_grid_lines:
-            glVertex3f(line[0][0], line[0][1], line[0][2])
-            glVertex3f(line[1][0], line[1][1], line[1][2])
-        glEnd()
-        
-        # Highlight main axes
-        glLineWidth(2)
-        
-        # X-axis (red)
-        glColor3f(1.0, 0.3, 0.3)
-        glBegin(GL_LINES)
-        glVertex3f(0, 0, 0)
-        glVertex3f(self.current_basis[0][0], self.current_basis[0][1], self.current_basis[0][2])
-        glEnd()
-        
-        # Y-axis (green)
-        glColor3f(0.3, 1.0, 0.3)
-        glBegin(GL_LINES)
-        glVertex3f(0, 0, 0)
-        glVertex3f(self.current_basis[1][0], self.current_basis[1][1], self.current_basis[1][2])
-        glEnd()
-        
-        # Z-axis (blue)
-        glColor3f(0.3, 0.3, 1.0)
-        glBegin(GL_LINES)
-        glVertex3f(0, 0, 0)
-        glVertex3f(self.current_basis[2][0], self.current_basis[2][1], self.current_basis[2][2])
-        glEnd()
+        GL.glLineWidth(1)
+        
+        # Draw original grid lines (faded), unless frames are running late
+        original = ()
+        if self.load_shedding == 0:
+            _, original = self.grid_elements(self.original_matrix)
+            GL.glColor4f(0.3, 0.3, 0.3, 0.4)
+            self.original_grid_buffer.draw(indices=original)
+        
+        # Draw current (animating) grid lines and the main axes (x red, y green, z blue); both paths
+        # keep current_matrix, and the current grid lines are the original ones under it
+        GL.glColor4f(0.6, 0.8, 1.0, 0.8)
+        self.grid_lod_level, current = self.grid_elements(self.current_matrix)
+        if self.animation_path == 'matrix':
+            # The untransformed grid under the model matrix
+            self.begin_model()
+            self.original_grid_buffer.draw(indices=current)
+            GL.glLineWidth(2)
+            self.original_basis_buffer.draw()
+            self.end_model()
+        else:
+            self.current_grid_buffer.draw(indices=current)
+            GL.glLineWidth(2)
+            self.basis_buffer.draw()
+        self.grid_segments_drawn = (len(original) + len(current)) // 2
+        
+        # Invariant axes (real eigenvectors of the target matrix)
+        if self.show_invariant_axes:
+            GL.glColor3f(1.0, 0.3, 1.0)
+            self.axes_buffer.draw()
         
         # Draw origin point
-        glPointSize(8)
-        glColor3f(1.0, 1.0, 1.0)
-        glBegin(GL_POINTS)
-        glVertex3f(0, 0, 0)
-        glEnd()
-        
-    def draw_cube(self, vertices, color=(0.5, 0.8, 1.0), alpha=0.7, wireframe=False):
-        """Draw a cube with given vertices"""
-        # Define cube faces
-        faces = [
-            [0, 1, 2, 3],  # bottom
-            [4, 5, 6, 7],  # top
-            [0, 1, 5, 4],  # front
-            [2, 3, 7, 6],  # back
-            [0, 3, 7, 4],  # left
-            [1, 2, 6, 5]   # right
-        ]
-        
+        GL.glPointSize(8)
+        GL.glColor3f(1.0, 1.0, 1.0)
+        self.origin_buffer.draw()
+        
+    def begin_model(self):
+        """In the matrix path, multiply the interpolated matrix onto the modelview; undone by end_model"""
+        if self.animation_path == 'matrix':
+            GL.glPushMatrix()
+            GL.glMultMatrixd(homogeneous(self.current_matrix).T)
+        
+    def end_model(self):
+        if self.animation_path == 'matrix':
+            GL.glPopMatrix()
+        
+    def draw_cube(self, mesh, color=(0.5, 0.8, 1.0), alpha=0.7, wireframe=False):
+        """Draw a cube mesh"""
         if not wireframe:
             # Draw cube faces with transparency
-            glColor4f(color[0], color[1], color[2], alpha)
-            glBegin(GL_QUADS)
-            for face in faces:
-                for vertex in face:
-                    glVertex3f(vertices[vertex][0], vertices[vertex][1], vertices[vertex][2])
-            glEnd()
+            GL.glColor4f(color[0], color[1], color[2], alpha)
+            mesh.draw_faces()
         
         # Draw cube edges
-        glColor3f(color[0]*0.7, color[1]*0.7, color[2]*0.7)
-        glLineWidth(2)
-        
-        edges = [
-            [0, 1], [1, 2], [2, 3], [3, 0],  # bottom face
-            [4, 5], [5, 6], [6, 7], [7, 4],  # top face
-            [0, 4], [1, 5], [2, 6], [3, 7]   # vertical edges
-        ]
-        
-        glBegin(GL_LINES)
-        for edge in edges:
-            for vertex in edge:
-                glVertex3f(vertices[vertex][0], vertices[vertex][1], vertices[vertex][2])
-        glEnd()
+        GL.glColor3f(color[0]*0.7, color[1]*0.7, color[2]*0.7)
+        GL.glLineWidth(2)
+        mesh.draw_edges()
         
         # Draw vertices
-        glPointSize(4)
-        glColor3f(1.0, 1.0, 1.0)
-        glBegin(GL_POINTS)
-        for vertex in vertices:
-            glVertex3f(vertex[0], vertex[1], vertex[2])
-        glEnd()
+        GL.glPointSize(4)
+        GL.glColor3f(1.0, 1.0, 1.0)
+        mesh.draw_points()
+        
+    def draw_particles(self):
+        """Draw the particles and their trails, older positions fading out"""
+        if self.particles is None:
+            return
+        count = self.particles.count
+        GL.glPointSize(2)
+        for slot, age in self.particles.ages():
+            GL.glColor4f(1.0, 0.9, 0.4, 0.9 * (1.0 - age / self.particles.trail_length))
+            self.particle_buffer.draw(first=slot * count, count=count)
+        
+    def draw_mesh(self):
+        """Draw the loaded mesh as translucent triangles with its edges"""
+        if self.mesh_buffer is None:
+            return
+        GL.glColor4f(0.4, 0.9, 0.6, 0.5)
+        self.mesh_buffer.draw()
+        GL.glLineWidth(1)
+        GL.glColor4f(0.2, 0.5, 0.3, 0.6)
+        self.mesh_buffer.draw(GL.GL_LINES, self.mesh_edge_indices)
         
     def apply_transformation(self, matrix):
         """Apply transformation matrix to cube, grid, and basis vectors"""
         self.transform_matrix = matrix
-        
-        # Transform cube vertices
-        self.transformed_cube = np.array([matrix @ vertex for vertex in self.original_cube])
-        
-        # Transform basis vectors
-        self.transformed_basis = np.array([matrix @ basis for basis in self.original_basis])
-        
-        # Transform grid lines
-        self.transformed_grid_lines = np.array([
-            [matrix @ line[0], matrix @ line[1]] for line in self.original_grid_lines
-        ])
-        
-        # Calculate determinants
-        self.original_determinant = np.linalg.det(np.eye(3))
-        self.transformed_determinant = np.linalg.det(matrix)
+        self.timeline_active = False
+        self.timeline.pause()
+        
+        # Transform cube vertices, basis vectors and grid line endpoints in one batch each
+        self.transformed_cube = apply_matrix(matrix, self.original_cube)
+        self.transformed_basis = apply_matrix(matrix, self.original_basis)
+        if self.particles is not None:
+            self.particles.set_matrix(matrix)
+            self.reseed_particles()
+        np.subtract(matrix, self.original_matrix, out=self.delta_matrix)
+        if self.animation_path == 'matrix':
+            # Nothing per vertex: GL applies the interpolated matrix to the untransformed buffers
+            self.transform_job = None
+        else:
+            if self.mesh is not None:
+                self.transformed_mesh = apply_matrix(matrix, self.original_mesh)
+            if self.lattice_mode:
+                # Large lattices are transformed a few chunks per frame by update_animation
+                self.transformed_grid_lines = self.lattice_output()
+                self.transform_job = transform_chunks(matrix, self.original_grid_lines,
+                                                      self.transformed_grid_lines)
+            else:
+                self.transformed_grid_lines = apply_matrix(matrix, self.original_grid_lines)
+                self.prepare_animation()
+        self.hover_pending = True
+        
+        # Look up determinant, eigenvectors, SVD and inverse
+        self.analysis = analyze(matrix)
+        self.transformed_determinant = self.analysis.determinant
+        self.axes_buffer.update(self.invariant_axis_segments(self.analysis))
         
         # Start animation
         self.animation_progress = 0
+        self.last_animation_time = self.time_source()
         self.is_animating = True
+        self.mark_dirty()
+        
+    def prepare_animation(self):
+        """Precompute transformed - original once so each frame is a single fused update"""
+        self.delta_cube = self.delta_buffer(self.delta_cube, self.original_cube, self.transformed_cube)
+        self.delta_basis = self.delta_buffer(self.delta_basis, self.original_basis, self.transformed_basis)
+        self.delta_grid_lines = self.delta_buffer(self.delta_grid_lines, self.original_grid_lines,
+                                                  self.transformed_grid_lines)
+        if self.mesh is not None:
+            self.delta_mesh = self.delta_buffer(self.delta_mesh, self.original_mesh, self.transformed_mesh)
+        
+    def delta_buffer(self, delta, original, transformed):
+        """Write transformed - original into delta, reallocating only if the shape changed"""
+        if delta.shape != original.shape or delta.dtype != original.dtype:
+            delta = np.empty_like(original)
+        return np.subtract(transformed, original, out=delta)
         
     def update_animation(self):
         """Update animation progress"""
+        now = self.time_source()
+        elapsed = min(now - self.last_animation_time, self.max_animation_step)
+        step = elapsed / self.animation_duration
+        self.last_animation_time = now
+        
+        if self.particles is not None:
+            self.advance_particles(elapsed)
+        
+        if self.transform_job is not None:
+            if not self.advance_transform_job():
+                # Hold the animation until the lattice has finished transforming
+                return
+            self.prepare_animation()
+            
+        if self.timeline_active:
+            if self.timeline.step(step):
+                self.show_timeline()
+            return
+            
         if self.is_animating:
-            self.animation_progress += self.animation_speed
+            self.animation_progress += step
             
             if self.animation_progress >= 1.0:
                 self.animation_progress = 1.0
                 self.is_animating = False
                 
-            # Smooth easing function
-            t = self.ease_in_out(self.animation_progress)
-            
-            # Interpolate cube vertices
-            self.current_cube = (1 - t) * self.original_cube + t * self.transformed_cube
-            
-            # Interpolate basis vectors
-            self.current_basis = (1 - t) * self.original_basis + t * self.transformed_basis
-            
-            # Interpolate grid lines
-            self.current_grid_lines = (1 - t) * self.original_grid_lines + t * self.transformed_grid_lines
+            self.show_animation_progress()
             
+    def show_animation_progress(self):
+        """Move the current geometry (or model matrix) to the eased animation_progress"""
+        # Smooth easing function
+        t = self.ease_in_out(self.animation_progress)
+        
+        # (1 - t) I + t A: the matrix path draws with it, and both paths cull the grid by it
+        lerp_delta(self.original_matrix, self.delta_matrix, t, out=self.current_matrix)
+        self.move_hover()
+        if not self.is_animating:
+            # Re-pick once the geometry stops under the cursor
+            self.hover_pending = True
+        if self.animation_path == 'matrix':
+            # One 3x3 update whatever the grid and mesh sizes
+            return
+        
+        # current = original + t * delta, written in place (no per-frame allocations)
+        lerp_delta(self.original_cube, self.delta_cube, t, out=self.current_cube)
+        lerp_delta(self.original_basis, self.delta_basis, t, out=self.current_basis)
+        lerp_delta(self.original_grid_lines, self.delta_grid_lines, t, out=self.current_grid_lines)
+        if self.mesh is not None:
+            lerp_delta(self.original_mesh, self.delta_mesh, t, out=self.current_mesh)
+        
+        self.sync_buffers()
+        
     def ease_in_out(self, t):
         """Smooth easing function"""
         return t * t * (3.0 - 2.0 * t)
         
+    def info_lines(self):
+        """Text shown in the info panel"""
+        if self.comparison_matrices:
+            return self.comparison_info_lines()
+        lines = ["Transformation matrix:"]
+        lines += [f"[ {row[0]:7.3f}  {row[1]:7.3f}  {row[2]:7.3f} ]" for row in self.transform_matrix]
+        lines.append(f"Determinant: {self.transformed_determinant:.3f}")
+        if self.timeline_active:
+            lines.append(f"Timeline: {self.timeline.time:.2f} / {self.timeline.duration:.0f}")
+        else:
+            lines.append(f"Animation: {self.animation_progress * 100:.0f}% ({self.animation_path})")
+        lines.append(f"Grid LOD {self.grid_lod_level}: {self.grid_segments_drawn} segments")
+        if self.hover is not None:
+            x, y, z = self.pick_index.points[self.hover]
+            u, v, w = self.hover_point
+            lines.append(f"Point ({x:.2f}, {y:.2f}, {z:.2f}) -> ({u:.2f}, {v:.2f}, {w:.2f})")
+        if self.particles is not None:
+            lines.append(f"Particles: {self.particles.count} ({self.particles.mode})")
+        if self.load_shedding:
+            lines.append(f"Over frame budget: reduced detail ({self.load_shedding})")
+        if self.show_profile:
+            means, fps = self.profiler.summary()
+            lines.append(f"FPS: {fps:.1f}")
+            lines += [f"  {phase}: {means[phase]:.2f} ms" for phase in self.profiler.phases]
+        return lines
+        
+    def comparison_info_lines(self):
+        """Info panel text in comparison mode"""
+        lines = [f"Comparing {len(self.comparison_matrices)} matrices ({self.comparison_layout})"]
+        for i, matrix in enumerate(self.comparison_matrices):
+            rows = "  ".join(" ".join(f"{value:.2f}" for value in row) for row in matrix)
+            lines.append(f"#{i + 1} det {analyze(matrix).determinant:.3f}: {rows}")
+        lines.append(f"Grid segments: {self.grid_segments_drawn}")
+        return lines
+        
     def draw_info_panel(self):
         """Draw information panel with transformation details"""
         # Switch to 2D rendering for UI
-        glMatrixMode(GL_PROJECTION)
-        glPushMatrix()
-        glLoadIdentity()
-        glOrtho(0, self.width, self.height, 0, -1, 1)
-        glMatrixMode(GL_MODELVIEW)
-        glPushMatrix()
-        glLoadIdentity()
+        GL.glMatrixMode(GL.GL_PROJECTION)
+        GL.glPushMatrix()
+        GL.glLoadIdentity()
+        GL.glOrtho(0, self.width, self.height, 0, -1, 1)
+        GL.glMatrixMode(GL.GL_MODELVIEW)
+        GL.glPushMatrix()
+        GL.glLoadIdentity()
+        
+        GL.glDisable(GL.GL_DEPTH_TEST)
+        
+        if self.text_panel is None:
+            self.text_panel = TextPanel()
+        lines = self.info_lines()
         
-        glDisable(GL_DEPTH_TEST)
+        # Grow the panel when extra lines (such as the profiling HUD) are shown, or are wider than it
+        bottom = max(220, 30 + len(lines) * self.text_panel.atlas.line_height)
+        right = max(400, 34 + int(np.ceil(self.text_panel.layout(lines, 22, 20))))
         
         # Draw semi-transparent background
-        glColor4f(0.0, 0.0, 0.0, 0.8)
-        glBegin(GL_QUADS)
-        glVertex2f(10, 10)
-        glVertex2f(400, 10)
-        glVertex2f(400, 220)
-        glVertex2f(10, 220)
-        glEnd()
+        GL.glColor4f(0.0, 0.0, 0.0, 0.8)
+        GL.glBegin(GL.GL_QUADS)
+        GL.glVertex2f(10, 10)
+        GL.glVertex2f(right, 10)
+        GL.glVertex2f(right, bottom)
+        GL.glVertex2f(10, bottom)
+        GL.glEnd()
         
         # Draw border
-        glColor4f(0.5, 0.8, 1.0, 1.0)
-        glLineWidth(2)
-        glBegin(GL_LINE_LOOP)
-        glVertex2f(10, 10)
-        glVertex2f(400, 10)
-        glVertex2f(400, 220)
-        glVertex2f(10, 220)
-        glEnd()
+        GL.glColor4f(0.5, 0.8, 1.0, 1.0)
+        GL.glLineWidth(2)
+        GL.glBegin(GL.GL_LINE_LOOP)
+        GL.glVertex2f(10, 10)
+        GL.glVertex2f(right, 10)
+        GL.glVertex2f(right, bottom)
+        GL.glVertex2f(10, bottom)
+        GL.glEnd()
         
-        glEnable(GL_DEPTH_TEST)
+        # Draw panel text from the cached glyph atlas
+        GL.glColor4f(0.9, 0.95, 1.0, 1.0)
+        self.text_panel.draw(lines, 22, 20)
+        
+        GL.glEnable(GL.GL_DEPTH_TEST)
         
         # Restore matrices
-        glPopMatrix()
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
-        glMatrixMode(GL_MODELVIEW)
+        GL.glPopMatrix()
+        GL.glMatrixMode(GL.GL_PROJECTION)
+        GL.glPopMatrix()
+        GL.glMatrixMode(GL.GL_MODELVIEW)
         
     def handle_mouse_motion(self, event):
         """Handle mouse motion for camera rotation"""
         if self.mouse_drag:
-            dx = event.pos[0] - self.last_mouse_pos[0]
-            dy = event.pos[1] - self.last_mouse_pos[1]
-            
-            self.camera_angle_y += dx * 0.5
-            self.camera_angle_x += dy * 0.5
-            
-            # Clamp vertical angle
-            self.camera_angle_x = max(-89, min(89, self.camera_angle_x))
+            self.orbit_delta[0] += event.pos[0] - self.last_mouse_pos[0]
+            self.orbit_delta[1] += event.pos[1] - self.last_mouse_pos[1]
+        else:
+            self.hover_pending = True
             
         self.last_mouse_pos = event.pos
         
     def handle_mouse_button(self, event):
         """Handle mouse button events"""
-        if event.type == MOUSEBUTTONDOWN:
+        if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:  # Left click
                 self.mouse_drag = True
                 self.last_mouse_pos = event.pos
             elif event.button == 4:  # Mouse wheel up
-                self.camera_distance = max(3, self.camera_distance - 0.5)
+                self.zoom_delta -= 0.5
             elif event.button == 5:  # Mouse wheel down
-                self.camera_distance = min(20, self.camera_distance + 0.5)
-        elif event.type == MOUSEBUTTONUP:
+                self.zoom_delta += 0.5
+        elif event.type == pygame.MOUSEBUTTONUP:
             if event.button == 1:
                 self.mouse_drag = False
                 
+    def apply_camera_input(self):
+        """Move the camera by the mouse motion and wheel steps accumulated since the last frame"""
+        dx, dy = self.orbit_delta
+        moved = False
+        if dx or dy:
+            moved = self.camera.orbit(dy * 0.5, dx * 0.5)
+            self.orbit_delta[:] = (0, 0)
+        if self.zoom_delta:
+            moved = self.camera.zoom(self.zoom_delta) or moved
+            self.zoom_delta = 0.0
+        if moved:
+            self.hover_pending = True
+            self.mark_dirty()
+        
     def show_matrix_gui(self):
         """Show the matrix input GUI"""
-        def gui_callback(matrix):
+        if self.replay is not None:
+            # The replayed session supplies the matrices that were entered
+            return
+        self.editor.show()
+        
+    def apply_pending_matrix(self, matrix):
+        """Apply the newest matrix submitted from the editor since the last frame"""
+        if matrix is not None:
             self.apply_transformation(matrix)
-            
-        self.gui = MatrixInputGUI(gui_callback)
-        self.gui_thread = threading.Thread(target=self.gui.show)
-        self.gui_thread.daemon = True
-        self.gui_thread.start()
+        
+    def adapt_to_frame_time(self, frame_ms, now=None):
+        """Shed optional work while frames run over budget; restore it once they are well under
+
+        Smoothing and the hold between level changes are measured in wall-clock time, so slow
+        frames (when shedding matters most) change the level as quickly as fast ones.
+        """
+        now = time.perf_counter() if now is None else now
+        interval = frame_ms / 1000 if self.frame_load_time is None else now - self.frame_load_time
+        self.frame_load_time = now
+        weight = 1.0 - np.exp(-max(interval, 0.0) / self.frame_load_window_s)
+        self.frame_load_ms += weight * (frame_ms - self.frame_load_ms)
+        if now < self.load_shedding_until:
+            return
+        if self.frame_load_ms > self.frame_budget_ms and self.load_shedding < self.max_load_shedding:
+            self.load_shedding += 1
+        elif self.frame_load_ms < 0.5 * self.frame_budget_ms and self.load_shedding > 0:
+            self.load_shedding -= 1
+        else:
+            return
+        # Give the new level time to show in the smoothed frame time
+        self.load_shedding_until = now + self.load_shedding_hold_s
+        
+    def toggle_profile(self):
+        """Show or hide per-phase frame timings in the info panel"""
+        self.show_profile = not self.show_profile
+        self.profiler.enabled = self.show_profile or self.profile_trace_path is not None
+        
+    def start_control_server(self):
+        """Listen for NDJSON commands; each arriving command wakes the loop with a custom event"""
+        wake_event = pygame.event.custom_type()
+        self.control = ControlServer(self.control_address,
+                                     notify=lambda: pygame.event.post(pygame.event.Event(wake_event)))
+        self.control.start()
+        print(f"Control server listening on {self.control.address}")
+        
+    def poll_control_commands(self):
+        """At most control_commands_per_frame queued socket commands"""
+        if self.control is None:
+            return []
+        commands = self.control.poll(self.control_commands_per_frame)
+        if self.control.pending():
+            # Leftovers run next frame; keep the loop from sleeping meanwhile
+            self.mark_dirty()
+        return commands
+        
+    def apply_control_commands(self, commands):
+        """Run the commands polled from the control server"""
+        matrix = None
+        for name, argument in commands:
+            if name == 'apply':
+                matrix = argument
+            elif name == 'reset':
+                matrix = np.eye(3)
+            elif name == 'camera':
+                self.camera.set(**argument)
+            elif name == 'duration':
+                self.animation_duration = argument
+            self.mark_dirty()
+        # Only the last matrix in the batch would survive its own animation, so apply just that one
+        if matrix is not None:
+            self.apply_transformation(matrix)
+        
+    def session_header(self):
+        """Scene settings a recorded session starts from"""
+        return {
+            "camera": {"distance": self.camera.distance, "angle_x": self.camera.angle_x,
+                       "angle_y": self.camera.angle_y},
+            "grid": {"size": self.grid_size, "spacing": self.grid_spacing, "density": self.grid_density,
+                     "lattice": self.lattice_mode},
+            "animation_path": self.animation_path,
+            "animation_duration": self.animation_duration,
+            "frame_budget_ms": self.frame_budget_ms,
+            "mesh": self.mesh_path,
+            "comparison": [matrix.tolist() for matrix in self.comparison_matrices],
+            "comparison_layout": self.comparison_layout,
+            "particles": None if self.particles is None else self.particles.mode,
+            "matrix": self.transform_matrix.tolist(),
+            "is_animating": self.is_animating,
+            "animation_progress": self.animation_progress,
+        }
+        
+    def apply_session_header(self, header):
+        """Restore the scene settings a recorded session started from"""
+        self.camera.set(**header["camera"])
+        grid = header["grid"]
+        self.grid_size, self.grid_spacing, self.grid_density = grid["size"], grid["spacing"], grid["density"]
+        self.lattice_mode = grid["lattice"]
+        self.animation_path = header["animation_path"]
+        self.animation_duration = header["animation_duration"]
+        self.frame_budget_ms = header["frame_budget_ms"]
+        if header["mesh"] is not None and header["mesh"] != self.mesh_path:
+            self.load_mesh_file(header["mesh"])
+        self.set_comparison(header["comparison"], header["comparison_layout"])
+        self.set_particle_mode(header["particles"])
+        self.transform_matrix = np.asarray(header["matrix"], dtype=float)
+        self.rebuild_grid()
+        
+        # rebuild_grid restarts the animation; put it back where the recording started instead
+        if self.transform_job is not None:
+            while not self.advance_transform_job():
+                pass
+            self.prepare_animation()
+        self.is_animating = header["is_animating"]
+        self.animation_progress = header["animation_progress"]
+        self.show_animation_progress()
+        
+    def start_session(self):
+        """Open the session log for recording or replay and route the animation clock through it"""
+        if self.replay_path is not None:
+            self.replay = SessionReplay(self.replay_path)
+            self.apply_session_header(self.replay.header)
+            self.replay_frames = self.replay.frames()
+            self.time_source = self.replay.read_clock
+            self.replay_start = time.perf_counter()
+        elif self.record_path is not None:
+            self.recorder = SessionRecorder(self.record_path, self.session_header())
+            self.time_source = self.recorder.clock(self.time_source)
+        self.last_animation_time = 0.0
+        
+    def next_inputs(self):
+        """Events, editor matrix and control commands for one loop iteration; None ends a replay"""
+        if self.replay is None:
+            return self.next_events(), self.editor.latest_matrix(), self.poll_control_commands()
+        
+        # Closing the window or pressing Escape stops the replay
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return None
+        self.replay_frame = next(self.replay_frames, None)
+        if self.replay_frame is None:
+            return None
+        if not self.replay_fast:
+            delay = self.replay_start + self.replay_frame.time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return self.replay_frame.events, self.replay_frame.matrix, self.replay_frame.commands
+        
+    def should_render(self):
+        """Live: whether anything changed; replaying: whether the recorded iteration drew a frame"""
+        if self.replay is not None:
+            # Same frames as the recording, at the load-shedding level it used
+            self.load_shedding = self.replay_frame.load_shedding
+            return self.replay_frame.render
+        return not self.is_idle()
+        
+    def finish_session(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            print(f"Session of {self.recorder.iterations} iterations recorded to {self.record_path}")
+        if self.replay is not None:
+            print(f"Replayed {self.frames_rendered} frames of {self.replay_path}")
+        
+    def mark_dirty(self):
+        """Request a redraw on the next loop iteration"""
+        self.needs_redraw = True
+        
+    def is_idle(self):
+        """True when nothing on screen would change if the frame were drawn again"""
+        return not (self.needs_redraw or self.is_animating or self.transform_job is not None
+                    or self.particles is not None or (self.timeline_active and self.timeline.playing))
+        
+    def next_events(self):
+        """Pending events; blocks for up to idle_timeout_ms when the scene is idle"""
+        if not self.is_idle():
+            return pygame.event.get()
+        timeout = self.editor_poll_ms if self.editor.is_open() else self.idle_timeout_ms
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+        
+    def handle_event(self, event):
+        """Dispatch one pygame event; returns False when the application should exit"""
+        if event.type == pygame.QUIT:
+            return False
+        elif event.type in WINDOW_EVENTS:
+            # Window was exposed, resized or restored
+            self.mark_dirty()
+        elif event.type == pygame.KEYDOWN:
+            self.mark_dirty()
+            if event.key == pygame.K_g:
+                # Show matrix GUI
+                self.show_matrix_gui()
+            elif event.key == pygame.K_r:
+                # Reset to identity
+                self.apply_transformation(np.eye(3))
+            elif event.key == pygame.K_l:
+                # Toggle volumetric lattice
+                self.set_lattice_mode(not self.lattice_mode)
+            elif event.key == pygame.K_e:
+                # Toggle invariant axes
+                self.show_invariant_axes = not self.show_invariant_axes
+            elif event.key == pygame.K_k:
+                # Append the current matrix to the timeline
+                self.timeline.add_keyframe(self.transform_matrix)
+            elif event.key == pygame.K_SPACE:
+                self.toggle_timeline()
+            elif event.key == pygame.K_LEFT:
+                self.seek_timeline(self.timeline.time - self.timeline_seek_step)
+            elif event.key == pygame.K_RIGHT:
+                self.seek_timeline(self.timeline.time + self.timeline_seek_step)
+            elif event.key == pygame.K_o:
+                self.timeline.loop = not self.timeline.loop
+            elif event.key == pygame.K_c:
+                # Clear the timeline
+                self.timeline.clear()
+                self.timeline_active = False
+            elif event.key == pygame.K_v:
+                # Compare the timeline keyframes side by side
+                self.toggle_comparison()
+            elif event.key == pygame.K_t:
+                # Tiled or overlaid comparison
+                self.comparison_layout = 'overlay' if self.comparison_layout == 'tiled' else 'tiled'
+            elif event.key == pygame.K_f:
+                # Cycle particle flow: off, continuous, discrete
+                self.cycle_particle_mode()
+            elif event.key == pygame.K_m:
+                # Animate the model matrix or every vertex
+                self.set_animation_path('vertices' if self.animation_path == 'matrix' else 'matrix')
+            elif event.key == pygame.K_p:
+                # Toggle the profiling HUD
+                self.toggle_profile()
+            elif event.key == pygame.K_ESCAPE:
+                return False
+        elif event.type == pygame.MOUSEMOTION:
+            self.handle_mouse_motion(event)
+        elif event.type in [pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP]:
+            self.handle_mouse_button(event)
+        return True
+        
+    def render_frame(self):
+        """Advance the animation and draw one frame (without swapping buffers)"""
+        profiler = self.profiler
+        
+        # Update animation
+        self.update_animation()
+        profiler.mark("update_animation")
+        
+        # Clear screen
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+        
+        # Set up camera
+        self.set_camera()
+        
+        if self.comparison_matrices:
+            self.draw_comparison()
+            profiler.mark("draw_grid")
+            self.draw_info_panel()
+            profiler.mark("draw_info_panel")
+            return
+        
+        # Draw scene
+        self.draw_transformed_grid()
+        profiler.mark("draw_grid")
+        
+        # Draw original cube (semi-transparent wireframe)
+        if self.is_animating or not np.allclose(self.transform_matrix, np.eye(3)):
+            self.draw_cube(self.original_cube_mesh, color=(0.8, 0.8, 0.8), alpha=0.3, wireframe=True)
+        
+        # Draw current cube (solid); the matrix path draws the original one under the model matrix
+        self.begin_model()
+        if self.animation_path == 'matrix':
+            self.draw_cube(self.original_cube_mesh, color=(1.0, 0.6, 0.2), alpha=0.8)
+        else:
+            self.draw_cube(self.current_cube_mesh, color=(1.0, 0.6, 0.2), alpha=0.8)
+        profiler.mark("draw_cubes")
+        
+        # Draw loaded mesh and the hovered point
+        self.draw_mesh()
+        self.end_model()
+        self.draw_hover()
+        profiler.mark("draw_mesh")
+        
+        # Draw particle flow
+        self.draw_particles()
+        profiler.mark("draw_particles")
+        
+        # Draw info panel
+        self.draw_info_panel()
+        profiler.mark("draw_info_panel")
         
     def run(self):
         """Main application loop"""
         self.init_pygame()
         
+        if self.control_address is not None and self.replay_path is None:
+            self.start_control_server()
+        self.start_session()
+        
         clock = pygame.time.Clock()
         running = True
         
@@ -494,65 +1435,124 @@ class LinearTransformationVisualizer:
         print("Controls:")
         print("  G - Open transformation matrix GUI")
         print("  R - Reset to identity matrix")
+        print("  L - Toggle full 3D lattice")
+        print("  E - Show invariant axes (eigenvectors)")
+        print("  K - Add current matrix as a timeline keyframe")
+        print("  Space - Play/pause timeline, Left/Right - Seek, O - Loop, C - Clear")
+        print("  V - Compare timeline keyframes, T - Tiled/overlaid comparison")
+        print("  F - Particle flow: continuous exp(tA), discrete x -> Ax, off")
+        print("  M - Animate by model matrix (GPU) or per vertex (CPU)")
+        print("  P - Show per-phase frame timings")
         print("  Mouse drag - Rotate camera")
         print("  Mouse wheel - Zoom in/out")
         print("  ESC - Exit")
         print("\nThe unit cube starts at origin (0,0,0) extending to (1,1,1)")
         print("Watch how the entire coordinate space transforms!")
         
+        profiler = self.profiler
+        profiler.enabled = self.show_profile or self.profile_trace_path is not None
+        
         while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+            inputs = self.next_inputs()
+            if inputs is None:
+                break
+            events, matrix, commands = inputs
+            # Timing starts after any idle wait; a skipped frame is overwritten by the next one
+            profiler.begin_frame()
+            if self.recorder is not None:
+                self.recorder.begin()
+            for event in events:
+                if not self.handle_event(event):
                     running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_g:
-                        # Show matrix GUI
-                        self.show_matrix_gui()
-                    elif event.key == pygame.K_r:
-                        # Reset to identity
-                        self.apply_transformation(np.eye(3))
-                    elif event.key == pygame.K_ESCAPE:
-                        running = False
-                elif event.type == pygame.MOUSEMOTION:
-                    self.handle_mouse_motion(event)
-                elif event.type in [pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP]:
-                    self.handle_mouse_button(event)
                     
-            # Update animation
-            self.update_animation()
-            
-            # Clear screen
-            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-            
-            # Set up camera
-            self.set_camera()
-            
-            # Draw scene
-            self.draw_transformed_grid()
+            self.apply_camera_input()
+            self.apply_pending_matrix(matrix)
+            self.apply_control_commands(commands)
+            self.update_hover()
             
-            # Draw original cube (semi-transparent wireframe)
-            if self.is_animating or not np.allclose(self.transform_matrix, np.eye(3)):
-                self.draw_cube(self.original_cube, color=(0.8, 0.8, 0.8), alpha=0.3, wireframe=True)
-            
-            # Draw current cube (solid)
-            self.draw_cube(self.current_cube, color=(1.0, 0.6, 0.2), alpha=0.8)
-            
-            # Draw info panel
-            self.draw_info_panel()
+            if not self.should_render():
+                # Nothing changed: keep the last frame on screen
+                self.frames_skipped += 1
+                if self.recorder is not None:
+                    self.recorder.end(events, matrix, commands, False, self.load_shedding)
+                continue
+            profiler.mark("events")
+            load_shedding = self.load_shedding
+                
+            frame_start = time.perf_counter()
+            self.render_frame()
+            self.adapt_to_frame_time((time.perf_counter() - frame_start) * 1000)
+            self.needs_redraw = False
+            self.frames_rendered += 1
+            if self.recorder is not None:
+                self.recorder.end(events, matrix, commands, True, load_shedding)
             
             pygame.display.flip()
-            clock.tick(60)
+            profiler.mark("flip")
+            if not (self.replay is not None and self.replay_fast):
+                clock.tick(60)
+            profiler.mark("tick")
+            profiler.end_frame()
             
-        # Clean up GUI
-        if self.gui:
-            self.gui.close_gui()
+        print(f"Frames rendered: {self.frames_rendered}, skipped while idle: {self.frames_skipped}")
+        self.finish_session()
+        
+        if self.profile_trace_path is not None:
+            self.profiler.dump(self.profile_trace_path)
+            print(f"Frame trace of {min(self.profiler.count, self.profiler.capacity)} frames written to "
+                  f"{self.profile_trace_path}")
+        
+        # Clean up GUI and control server
+        self.editor.close()
+        if self.control is not None:
+            self.control.stop()
             
         pygame.quit()
 
 def main():
     """Main function to run the visualizer"""
+    parser = argparse.ArgumentParser(description="Linear transformations visualizer")
+    parser.add_argument("--mesh", help="OBJ or PLY mesh to transform along with the unit cube")
+    parser.add_argument("--compare", type=float, nargs=9, action="append", metavar="A",
+                        help="Matrix in row-major order to show in comparison mode; repeat for each matrix")
+    parser.add_argument("--control", metavar="ADDRESS",
+                        help="Accept NDJSON commands on host:port, a port on 127.0.0.1, or unix:/path")
+    parser.add_argument("--profile-trace", metavar="PATH",
+                        help="Record per-phase frame timings and write them to a CSV or JSON file on exit")
+    parser.add_argument("--record", metavar="PATH",
+                        help="Record input events and matrices to a JSON-lines session log (.gz to compress)")
+    parser.add_argument("--replay", metavar="PATH", help="Replay a recorded session log instead of live input")
+    parser.add_argument("--fast", action="store_true",
+                        help="With --replay, run as fast as possible instead of at the recorded pace")
+    parser.add_argument("--animate", choices=["matrix", "vertices"], default="matrix",
+                        help="Interpolate the model matrix on the GPU (default) or every vertex on the CPU")
+    parser.add_argument("--keyframe", type=float, nargs=9, action="append", metavar="A",
+                        help="Matrix in row-major order to append to the timeline; repeat for each keyframe")
+    parser.add_argument("--export", metavar="DIR",
+                        help="Render the timeline (or the identity) to PNG frames in DIR offline and exit")
+    parser.add_argument("--export-frames", type=int, default=120, metavar="N",
+                        help="Number of frames written by --export (default 120)")
+    args = parser.parse_args()
+    
     try:
         visualizer = LinearTransformationVisualizer()
+        if args.animate != visualizer.animation_path:
+            visualizer.set_animation_path(args.animate)
+        if args.mesh:
+            visualizer.load_mesh_file(args.mesh)
+        if args.compare:
+            visualizer.set_comparison([np.array(m).reshape(3, 3) for m in args.compare])
+        for matrix in args.keyframe or []:
+            visualizer.timeline.add_keyframe(np.array(matrix).reshape(3, 3))
+        if args.export:
+            paths = visualizer.export_frames(args.export, frames=args.export_frames)
+            print(f"Wrote {len(paths)} frames to {args.export}")
+            return
+        visualizer.profile_trace_path = args.profile_trace
+        visualizer.control_address = args.control
+        visualizer.record_path = args.record
+        visualizer.replay_path = args.replay
+        visualizer.replay_fast = args.fast
         visualizer.run()
     except Exception as e:
         print(f"Error running visualizer: {e}")
@@ -0,0 +1,237 @@
+import collections
+import glob
+import hashlib
+import os
+
+import numpy as np
+
+Mesh = collections.namedtuple("Mesh", ["vertices", "faces", "edges"])
+
+CACHE_APP_NAME = "linear-transformations-visualizer"
+
+# PLY scalar types and their NumPy equivalents
+PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+
+
+def triangulate(polygons):
+    """Fan-triangulate polygons given as lists of vertex indices or one (M, k) array"""
+    by_size = collections.defaultdict(list)
+    if isinstance(polygons, np.ndarray) and polygons.ndim == 2:
+        by_size[polygons.shape[1]] = polygons
+    else:
+        for polygon in polygons:
+            by_size[len(polygon)].append(polygon)
+
+    triangles = []
+    for size, group in by_size.items():
+        if size < 3:
+            continue
+        group = np.asarray(group, dtype=np.int64)
+        # Triangle k of each polygon is (0, k + 1, k + 2)
+        for k in range(size - 2):
+            triangles.append(group[:, [0, k + 1, k + 2]])
+    if not triangles:
+        return np.zeros((0, 3), dtype=np.int64)
+    return np.concatenate(triangles)
+
+
+def unique_edges(faces):
+    """Undirected edges shared by the triangles, each listed once"""
+    if len(faces) == 0:
+        return np.zeros((0, 2), dtype=np.uint32)
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    edges.sort(axis=1)
+    return np.unique(edges, axis=0).astype(np.uint32)
+
+
+def parse_obj(path):
+    """Vertices and triangulated faces of a Wavefront OBJ file"""
+    vertex_tokens = []
+    polygons = []
+    with open(path, "r", errors="replace") as f:
+        for line in f:
+            if line.startswith("v "):
+                vertex_tokens.extend(line.split()[1:4])
+            elif line.startswith("f "):
+                # Entries look like v, v/vt, v//vn or v/vt/vn; only v matters here.
+                # OBJ indices are 1-based; negative ones count back from the last vertex read so far
+                count = len(vertex_tokens) // 3
+                indices = [int(entry.split("/")[0]) for entry in line.split()[1:]]
+                polygons.append([i + count if i < 0 else i - 1 for i in indices])
+
+    vertices = np.array(vertex_tokens, dtype=np.float32).reshape(-1, 3)
+    return vertices, triangulate(polygons)
+
+
+def read_ply_header(f):
+    """Format and element descriptions of a PLY header, leaving f at the body"""
+    if f.readline().strip() != b"ply":
+        raise ValueError("Not a PLY file")
+    fmt = None
+    elements = []
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("Truncated PLY header")
+        words = line.decode("ascii", errors="replace").split()
+        if not words:
+            continue
+        if words[0] == "format":
+            fmt = words[1]
+        elif words[0] == "element":
+            elements.append({"name": words[1], "count": int(words[2]), "properties": []})
+        elif words[0] == "property":
+            if words[1] == "list":
+                elements[-1]["properties"].append((words[4], "list", PLY_TYPES[words[2]], PLY_TYPES[words[3]]))
+            else:
+                elements[-1]["properties"].append((words[2], PLY_TYPES[words[1]]))
+        elif words[0] == "end_header":
+            return fmt, elements
+
+
+def read_ply_faces_binary(f, element, endian):
+    """Face lists of a binary PLY element, fast when every face has the same size"""
+    props = element["properties"]
+    count = element["count"]
+    if len(props) != 1 or props[0][1] != "list":
+        raise ValueError("Only PLY faces with a single list property are supported")
+    _, _, count_type, index_type = props[0]
+    count_dtype = np.dtype(endian + count_type)
+    index_dtype = np.dtype(endian + index_type)
+
+    # Peek at the first face size and try reading every face as that size
+    start = f.tell()
+    first = int(np.frombuffer(f.read(count_dtype.itemsize), count_dtype)[0]) if count else 3
+    f.seek(start)
+    record = np.dtype([("n", count_dtype), ("i", index_dtype, (first,))])
+    body = f.read(record.itemsize * count)
+    if len(body) == record.itemsize * count:
+        data = np.frombuffer(body, record)
+        if (data["n"] == first).all():
+            return triangulate(data["i"])
+
+    # Mixed polygon sizes: walk the faces one by one
+    f.seek(start)
+    polygons = []
+    for _ in range(count):
+        n = int(np.frombuffer(f.read(count_dtype.itemsize), count_dtype)[0])
+        polygons.append(np.frombuffer(f.read(index_dtype.itemsize * n), index_dtype))
+    return triangulate(polygons)
+
+
+def parse_ply(path):
+    """Vertices and triangulated faces of an ASCII or binary PLY file"""
+    with open(path, "rb") as f:
+        fmt, elements = read_ply_header(f)
+        vertices = np.zeros((0, 3), dtype=np.float32)
+        faces = np.zeros((0, 3), dtype=np.int64)
+
+        if fmt == "ascii":
+            lines = iter(f.read().decode("ascii", errors="replace").splitlines())
+            for element in elements:
+                rows = [next(lines).split() for _ in range(element["count"])]
+                if element["name"] == "vertex":
+                    names = [p[0] for p in element["properties"]]
+                    columns = [names.index(axis) for axis in "xyz"]
+                    vertices = np.array([[row[c] for c in columns] for row in rows], dtype=np.float32)
+                elif element["name"] == "face":
+                    faces = triangulate([[int(v) for v in row[1:1 + int(row[0])]] for row in rows])
+            return vertices, faces
+
+        endian = {"binary_little_endian": "<", "binary_big_endian": ">"}.get(fmt)
+        if endian is None:
+            raise ValueError(f"Unsupported PLY format: {fmt}")
+        for element in elements:
+            if element["name"] == "face":
+                faces = read_ply_faces_binary(f, element, endian)
+                continue
+            if any(p[1] == "list" for p in element["properties"]):
+                raise ValueError(f"Unsupported list property in PLY element {element['name']}")
+            record = np.dtype([(p[0], endian + p[1]) for p in element["properties"]])
+            data = np.frombuffer(f.read(record.itemsize * element["count"]), record)
+            if element["name"] == "vertex":
+                vertices = np.stack([data[axis] for axis in "xyz"], axis=1).astype(np.float32)
+        return vertices, faces
+
+
+PARSERS = {".obj": parse_obj, ".ply": parse_ply}
+
+
+def default_cache_dir():
+    """Per-user mesh cache directory: $XDG_CACHE_HOME, falling back to ~/.cache"""
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(root, CACHE_APP_NAME, "meshes")
+
+
+def cache_stem(path, cache_dir=None):
+    """Cache file prefix shared by every version of the source file at path"""
+    path = os.path.abspath(path)
+    source = hashlib.sha1(path.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir or default_cache_dir(), f"{os.path.basename(path)}.{source}")
+
+
+def cache_paths(path, cache_dir=None):
+    """Cache file paths, keyed by the source path, size and modification time"""
+    stat = os.stat(path)
+    version = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+    stem = f"{cache_stem(path, cache_dir)}.{version}"
+    return {name: f"{stem}.{name}.npy" for name in Mesh._fields}
+
+
+def write_cache(arrays, paths, stale):
+    """Save arrays to their cache paths and delete the stale files of older versions"""
+    os.makedirs(os.path.dirname(paths["vertices"]), exist_ok=True)
+    for name, array in arrays.items():
+        # Write then rename so an interrupted save never leaves a partial cache
+        temporary = paths[name] + ".tmp.npy"
+        np.save(temporary, np.ascontiguousarray(array))
+        os.replace(temporary, paths[name])
+    for old in stale:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+
+def load_mesh(path, cache_dir=None):
+    """Load an OBJ or PLY mesh, parsing it once and memory-mapping the binary cache afterwards
+
+    Vertices are float32 (N, 3); faces are uint32 triangles (M, 3); edges are
+    uint32 (E, 2). The arrays are read-only memory maps of the cache in
+    cache_dir (default_cache_dir() if None); if the cache cannot be written,
+    the parsed arrays are returned instead.
+    """
+    parser = PARSERS.get(os.path.splitext(path)[1].lower())
+    if parser is None:
+        raise ValueError(f"Unsupported mesh format: {path}")
+
+    paths = cache_paths(path, cache_dir)
+    if not all(os.path.exists(p) for p in paths.values()):
+        vertices, faces = parser(path)
+        if len(faces) and (faces.min() < 0 or faces.max() >= len(vertices)):
+            raise ValueError(f"Face index out of range in {path}")
+        faces = faces.astype(np.uint32)
+        arrays = {"vertices": vertices, "faces": faces, "edges": unique_edges(faces)}
+        stale = set(glob.glob(glob.escape(cache_stem(path, cache_dir)) + ".*.npy")) - set(paths.values())
+        try:
+            write_cache(arrays, paths, stale)
+        except OSError:
+            # Read-only or full cache location: use the parsed mesh without caching it
+            return Mesh(**arrays)
+
+    return Mesh(**{name: np.load(p, mmap_mode="r") for name, p in paths.items()})
+
+
+def fit_to_unit_cube(vertices):
+    """Scale and translate vertices into [0, 1]^3, keeping proportions, like the unit cube"""
+    vertices = np.asarray(vertices, dtype=np.float32)
+    if len(vertices) == 0:
+        return vertices.copy()
+    low = vertices.min(axis=0)
+    extent = float((vertices.max(axis=0) - low).max()) or 1.0
+    return (vertices - low) / np.float32(extent)
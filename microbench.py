@@ -0,0 +1,186 @@
+"""Microbenchmarks for the geometry and animation hot paths
+
+Times transform.apply_matrix, transform.interpolate_vertices and the
+visualizer's generate_grid_lines, apply_transformation and update_animation
+over grid sizes, mesh sizes, matrix types and both animation paths, without
+opening a window.
+Results can be saved as a JSON baseline and later runs compared against it;
+the run fails (exit status 1) when a case gets slower than the threshold.
+
+    python microbench.py --save-baseline bench.json
+    python microbench.py --baseline bench.json --threshold 0.25
+"""
+import argparse
+import functools
+import json
+import sys
+import time
+
+import numpy as np
+
+import headless  # Sets up SDL/PyOpenGL for running without a display
+from lattice import generate_lattice_lines
+from transform import apply_matrix, interpolate_vertices
+
+MATRICES = {
+    "identity": np.eye(3),
+    "singular": np.array([[1, 0, 0], [0, 1, 0], [1, 1, 0]], dtype=float),
+    "rotation": np.array([[0.6, -0.8, 0], [0.8, 0.6, 0], [0, 0, 1]]),
+    "shear": np.array([[1, 0.5, 0], [0, 1, 0], [0, 0, 1]]),
+}
+GRID_SIZES = (8, 16, 32)
+MESH_SIZES = (1000, 100000, 1000000)
+DEFAULT_THRESHOLD = 0.25  # Allowed slowdown relative to the baseline
+
+
+def mesh_vertices(count, seed=0):
+    return np.random.default_rng(seed).uniform(-1, 1, (count, 3))
+
+
+@functools.lru_cache(maxsize=None)
+def visualizer(grid_size, lattice=False):
+    """Shared visualizer for one grid, animating on a fixed-step clock"""
+    return headless.scripted_visualizer(grid_size, lattice)
+
+
+def applying(v, matrix, path="matrix"):
+    v.set_animation_path(path)
+
+    def run():
+        v.apply_transformation(matrix)
+    return run
+
+
+def animating(v, matrix, path="matrix"):
+    v.set_animation_path(path)
+    v.apply_transformation(matrix)
+    # Keep the animation mid-flight so every timed call does the full update
+    v.animation_duration = 1e9
+    v.animation_progress = 0.5
+
+    def run():
+        v.is_animating = True
+        v.update_animation()
+    return run
+
+
+def generating(v, lattice):
+    def run():
+        if lattice:
+            # Time the generation itself rather than a memoized lookup
+            generate_lattice_lines.cache_clear()
+        v.generate_grid_lines()
+    return run
+
+
+def cases(grid_sizes=GRID_SIZES, mesh_sizes=MESH_SIZES):
+    """(name, setup) pairs; setup builds the inputs and returns the zero-argument callable to time"""
+    for count in mesh_sizes:
+        for kind, matrix in MATRICES.items():
+            yield (f"apply_matrix[mesh={count},matrix={kind}]",
+                   lambda count=count, matrix=matrix: functools.partial(apply_matrix, matrix, mesh_vertices(count)))
+        yield (f"interpolate_vertices[mesh={count}]",
+               lambda count=count: functools.partial(interpolate_vertices, mesh_vertices(count), mesh_vertices(count, 1),
+                                                     0.5, out=np.empty((count, 3))))
+
+    for size in grid_sizes:
+        for lattice in (False, True):
+            layout = "lattice" if lattice else "planes"
+            yield (f"generate_grid_lines[grid={size},{layout}]",
+                   lambda size=size, lattice=lattice: generating(visualizer(size, lattice), lattice))
+        for kind, matrix in MATRICES.items():
+            for path in ("matrix", "vertices"):
+                yield (f"apply_transformation[grid={size},matrix={kind},path={path}]",
+                       lambda size=size, matrix=matrix, path=path: applying(visualizer(size), matrix, path))
+                yield (f"update_animation[grid={size},matrix={kind},path={path}]",
+                       lambda size=size, matrix=matrix, path=path: animating(visualizer(size), matrix, path))
+
+
+def measure(func, min_time=0.02, repeat=5):
+    """Best seconds per call over repeat runs of enough calls to last min_time each"""
+    func()  # Warm up caches and lazily allocated buffers
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, int(min_time / elapsed) + 1)
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def run_cases(selected, min_time, repeat):
+    """Seconds per call of each case, printing progress to stderr"""
+    results = {}
+    for name, setup in selected:
+        results[name] = measure(setup(), min_time, repeat)
+        print(f"{name:60s} {results[name] * 1e6:12.2f} us", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Cases slower than baseline * (1 + threshold), as (name, baseline, current, ratio) rows"""
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference and current > reference * (1 + threshold):
+            regressions.append((name, reference, current, current / reference))
+    return sorted(regressions, key=lambda row: -row[3])
+
+
+def format_report(regressions, threshold):
+    lines = [f"{len(regressions)} case(s) slower than the baseline by more than {threshold:.0%}:"]
+    lines.append(f"  {'case':60s} {'baseline us':>12s} {'current us':>12s} {'change':>8s}")
+    for name, reference, current, ratio in regressions:
+        lines.append(f"  {name:60s} {reference * 1e6:12.2f} {current * 1e6:12.2f} {ratio - 1:+8.0%}")
+    return "\n".join(lines)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the geometry and animation hot paths")
+    parser.add_argument("--grid-sizes", type=int, nargs="+", default=list(GRID_SIZES))
+    parser.add_argument("--mesh-sizes", type=int, nargs="+", default=list(MESH_SIZES))
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.02, help="Seconds per timed repeat")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", help="Compare against this JSON baseline and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown as a fraction of the baseline (default 0.25)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write the results as a new baseline")
+    args = parser.parse_args(argv)
+
+    selected = [case for case in cases(args.grid_sizes, args.mesh_sizes) if args.filter in case[0]]
+    results = run_cases(selected, args.min_time, args.repeat)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "python": sys.version.split()[0],
+                "numpy": np.__version__,
+                "seconds_per_call": results,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Baseline of {len(results)} cases written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["seconds_per_call"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(format_report(regressions, args.threshold))
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} in {len(results)} cases")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,135 @@
+import math
+import numpy as np
+
+from analysis import analyze, matrix_key
+
+DEFECTIVE_CONDITION = 1e8  # Eigenvector matrices worse than this fall back to the series
+
+
+def exp_series(matrix, t):
+    """exp(tA) by scaling and squaring a truncated Taylor series; works for any matrix"""
+    scaled = np.asarray(matrix, dtype=float) * t
+    norm = np.abs(scaled).sum(axis=0).max()
+    squarings = max(0, int(math.ceil(math.log2(norm))) + 1) if norm > 0 else 0
+    scaled /= 2 ** squarings
+
+    result = np.eye(3)
+    term = np.eye(3)
+    for k in range(1, 13):
+        term = term @ scaled / k
+        result += term
+    for _ in range(squarings):
+        result = result @ result
+    return result
+
+
+class EigenExponential:
+    """exp(tA) for many t from one eigendecomposition, A = V diag(w) V^-1
+
+    Defective matrices (such as shears) have no usable eigenvector basis and
+    use exp_series instead.
+    """
+
+    def __init__(self, matrix):
+        self.matrix = np.asarray(matrix, dtype=float).reshape(3, 3)
+        analysis = analyze(self.matrix)
+        self.eigenvalues = analysis.eigenvalues
+        self.eigenvectors = analysis.eigenvectors
+        self.inverse_eigenvectors = None
+        if np.linalg.cond(self.eigenvectors) < DEFECTIVE_CONDITION:
+            self.inverse_eigenvectors = np.linalg.inv(self.eigenvectors)
+
+    def __call__(self, t):
+        if self.inverse_eigenvectors is None:
+            return exp_series(self.matrix, t)
+        return ((self.eigenvectors * np.exp(t * self.eigenvalues)) @ self.inverse_eigenvectors).real
+
+
+class ParticleFlow:
+    """Particles moved by x -> Ax ('discrete') or x -> exp(dt A) x ('continuous')
+
+    Positions live in a preallocated float32 ring of trail_length snapshots,
+    shape (trail_length, count, 3); trails[head] is the newest. Each step is
+    one matmul from the newest snapshot into the next slot. Particles that
+    leave max_radius or collapse within min_radius of the origin are reseeded
+    in the unit cube.
+    """
+
+    def __init__(self, count=50000, trail_length=12, mode='continuous', rate=1.0, steps_per_second=2.0,
+                 max_radius=16.0, min_radius=1e-2, seed=0):
+        self.count = count
+        self.mode = mode
+        self.rate = rate                          # Flow time per second of wall-clock time
+        self.steps_per_second = steps_per_second  # Applications of A per second in discrete mode
+        self.max_radius = max_radius
+        self.min_radius = min_radius
+        self.rng = np.random.default_rng(seed)
+
+        self.trails = np.empty((trail_length, count, 3), dtype=np.float32)
+        self.head = 0
+        self.filled = 1
+        self.trails[0] = self.rng.random((count, 3), dtype=np.float32)
+        self.norms = np.empty(count, dtype=np.float32)
+
+        self.exponentials = {}
+        self.matrix = np.eye(3)
+        self.exponential = self.exponential_for(self.matrix)
+        self.pending_time = 0.0
+
+    @property
+    def trail_length(self):
+        return len(self.trails)
+
+    @property
+    def positions(self):
+        return self.trails[self.head]
+
+    def exponential_for(self, matrix):
+        """Cached EigenExponential of a matrix"""
+        key = matrix_key(matrix)
+        if key not in self.exponentials:
+            if len(self.exponentials) >= 16:
+                self.exponentials.clear()
+            self.exponentials[key] = EigenExponential(matrix)
+        return self.exponentials[key]
+
+    def set_matrix(self, matrix):
+        self.matrix = np.asarray(matrix, dtype=float).reshape(3, 3)
+        self.exponential = self.exponential_for(self.matrix)
+
+    def reseed(self):
+        """Start every particle afresh in the unit cube with no trail"""
+        self.head = 0
+        self.filled = 1
+        self.trails[0] = self.rng.random((self.count, 3), dtype=np.float32)
+        self.pending_time = 0.0
+
+    def step(self, step_matrix):
+        """Move every particle by one matrix into the next ring slot; returns that slot"""
+        current = self.trails[self.head]
+        self.head = (self.head + 1) % self.trail_length
+        self.filled = min(self.filled + 1, self.trail_length)
+        new = self.trails[self.head]
+        np.matmul(current, step_matrix.T.astype(np.float32), out=new)
+
+        # Reseed particles that escaped or collapsed onto the origin
+        np.einsum('ij,ij->i', new, new, out=self.norms)
+        lost = (self.norms > self.max_radius ** 2) | (self.norms < self.min_radius ** 2)
+        if lost.any():
+            new[lost] = self.rng.random((int(lost.sum()), 3), dtype=np.float32)
+        return self.head
+
+    def advance(self, elapsed):
+        """Advance by elapsed wall-clock seconds; returns the ring slots written"""
+        if self.mode == 'continuous':
+            return [self.step(self.exponential(elapsed * self.rate))]
+        self.pending_time += elapsed * self.steps_per_second
+        written = []
+        while self.pending_time >= 1.0:
+            self.pending_time -= 1.0
+            written.append(self.step(self.matrix))
+        return written
+
+    def ages(self):
+        """(slot, age) pairs from newest (age 0) to oldest"""
+        return [((self.head - age) % self.trail_length, age) for age in range(self.filled)]
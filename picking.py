@@ -0,0 +1,124 @@
+import functools
+import numpy as np
+
+PICK_RADIUS_PX = 8  # How far from the cursor, on screen, a point can be picked
+
+MAX_RAY_SAMPLES = 4096
+MAX_REACH = 3  # Neighbour rings searched around the ray before scoring every point instead
+
+
+@functools.lru_cache(maxsize=None)
+def neighbours(reach):
+    """Offsets of a cell and the cells up to reach rings around it"""
+    steps = np.arange(-reach, reach + 1)
+    return np.stack(np.meshgrid(steps, steps, steps, indexing='ij'), axis=-1).reshape(-1, 3)
+
+
+class PointIndex:
+    """Uniform grid hash over a fixed set of 3D points, queried with rays
+
+    Points are bucketed into cubic cells (about one point per cell on
+    average), sorted by cell so every cell is one contiguous run. A ray query
+    walks the cells along the ray, gathers the points in and around them, and
+    measures all of their distances to the ray in one vectorized pass.
+    """
+
+    def __init__(self, points, cell_size=None):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if len(self.points) == 0:
+            self.low = self.high = np.zeros(3)
+            self.cell_size = 1.0
+            self.dims = np.ones(3, dtype=np.int64)
+            self.order = self.cell_ids = self.starts = self.counts = np.zeros(0, dtype=np.int64)
+            return
+
+        self.low = self.points.min(axis=0)
+        self.high = self.points.max(axis=0)
+        extent = float((self.high - self.low).max()) or 1.0
+        self.cell_size = cell_size or extent / max(round(len(self.points) ** (1 / 3)), 1)
+
+        cells = np.floor((self.points - self.low) / self.cell_size).astype(np.int64)
+        self.dims = np.floor((self.high - self.low) / self.cell_size).astype(np.int64) + 1
+        keys = self.cell_keys(cells)
+        self.order = np.argsort(keys, kind='stable')
+        self.cell_ids, self.starts, self.counts = np.unique(keys[self.order], return_index=True, return_counts=True)
+
+    def cell_keys(self, cells):
+        return (cells[:, 0] * self.dims[1] + cells[:, 1]) * self.dims[2] + cells[:, 2]
+
+    def ray_span(self, origin, direction, reach=1):
+        """Ray parameters where it enters and leaves the points' bounding box, or None if it misses"""
+        margin = self.cell_size * reach
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t0 = (self.low - margin - origin) / direction
+            t1 = (self.high + margin - origin) / direction
+        near = np.nanmax(np.minimum(t0, t1))
+        far = np.nanmin(np.maximum(t0, t1))
+        near = max(near, 0.0)
+        if not far >= near:
+            return None
+        return near, far
+
+    def candidates(self, origin, direction, reach=1):
+        """Indices of the points in cells along the ray and up to reach rings of neighbours"""
+        span = self.ray_span(origin, direction, reach)
+        if span is None or len(self.cell_ids) == 0:
+            return np.zeros(0, dtype=np.int64)
+        near, far = span
+        step = max(self.cell_size / 2, (far - near) / MAX_RAY_SAMPLES)
+        t = np.arange(near, far + step, step)
+        cells = np.floor((origin + t[:, None] * direction - self.low) / self.cell_size).astype(np.int64)
+        cells = (cells[:, None, :] + neighbours(reach)).reshape(-1, 3)
+        cells = cells[((cells >= 0) & (cells < self.dims)).all(axis=1)]
+        keys = np.unique(self.cell_keys(cells))
+
+        # Keep only the cells that hold points
+        slots = np.searchsorted(self.cell_ids, keys)
+        found = slots < len(self.cell_ids)
+        found[found] = self.cell_ids[slots[found]] == keys[found]
+        slots = slots[found]
+        starts, counts = self.starts[slots], self.counts[slots]
+        # Concatenate the runs [start, start + count) without a Python loop
+        runs = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        return self.order[runs]
+
+    def pick(self, origin, direction, tolerance, matrix=None):
+        """Index of the point closest in angle to the ray, within tolerance radians, or None
+
+        With a matrix, the points are taken at matrix @ point. The ray is
+        mapped back into the indexed points' space instead of re-indexing
+        the moved points; a matrix that stretches some directions k times
+        more than others searches k rings of neighbour cells around it. Past
+        MAX_REACH rings, and for singular matrices, every point is scored.
+        """
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+        direction = direction / np.linalg.norm(direction)
+        matrix = np.eye(3) if matrix is None else np.asarray(matrix, dtype=np.float64)
+        stretch = np.linalg.svd(matrix, compute_uv=False)
+        if stretch[0] < MAX_REACH * stretch[-1]:
+            inverse = np.linalg.inv(matrix)
+            local = inverse @ direction
+            reach = max(int(np.ceil(stretch[0] / stretch[-1] - 1e-9)), 1)
+            candidates = self.candidates(inverse @ origin, local / np.linalg.norm(local), reach)
+            if len(candidates) == 0:
+                return None
+            points = self.points[candidates]
+        elif len(self.points):
+            candidates = None
+            points = self.points
+        else:
+            return None
+
+        # Rows of frame run across the ray twice and then along it, so the third coordinate is depth
+        across = np.cross(direction, [1.0, 0.0, 0.0] if abs(direction[0]) < 0.9 else [0.0, 1.0, 0.0])
+        across /= np.linalg.norm(across)
+        frame = np.stack([across, np.cross(direction, across), direction])
+        offsets = points @ (frame @ matrix).T - frame @ origin
+        depth = offsets[:, 2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            angle = np.where(depth > 0, np.hypot(offsets[:, 0], offsets[:, 1]) / depth, np.inf)
+        best = int(np.argmin(angle))
+        if angle[best] > tolerance:
+            return None
+        return best if candidates is None else int(candidates[best])
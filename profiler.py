@@ -0,0 +1,97 @@
+import csv
+import json
+import time
+
+import numpy as np
+
+# Phases of one pass through the visualizer's main loop, in order
+PHASES = ("events", "update_animation", "draw_grid", "draw_cubes", "draw_mesh", "draw_particles", "draw_info_panel",
+          "flip", "tick")
+RING_SIZE = 1024  # Frames kept for the HUD and the trace
+
+
+class FrameProfiler:
+    """Per-phase frame timings written into a fixed-size ring buffer
+
+    Call begin_frame, then mark(phase) at the end of each phase to charge it
+    the time since the previous mark, then end_frame. While disabled, each
+    call returns after a single attribute check; enabling takes effect at the
+    next begin_frame.
+    """
+
+    def __init__(self, phases=PHASES, capacity=RING_SIZE):
+        self.phases = tuple(phases)
+        self.slots = {phase: i for i, phase in enumerate(self.phases)}
+        self.durations = np.zeros((capacity, len(self.phases)))  # ms per phase
+        self.starts = np.zeros(capacity)  # perf_counter() at the start of each frame
+        self.count = 0  # Frames recorded since the last reset
+        self.enabled = False
+        self.row = None
+        self.last = 0.0
+
+    @property
+    def capacity(self):
+        return len(self.starts)
+
+    def reset(self):
+        self.count = 0
+        self.row = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            self.row = None
+            return
+        now = time.perf_counter()
+        slot = self.count % self.capacity
+        self.row = self.durations[slot]
+        self.row[:] = 0.0
+        self.starts[slot] = now
+        self.last = now
+
+    def mark(self, phase):
+        """Charge the time since the previous mark (or begin_frame) to phase"""
+        if self.row is None:
+            return
+        now = time.perf_counter()
+        self.row[self.slots[phase]] += (now - self.last) * 1000.0
+        self.last = now
+
+    def end_frame(self):
+        if self.row is None:
+            return
+        self.row = None
+        self.count += 1
+
+    def recent(self, frames=None):
+        """Start times and per-phase durations of the last frames, oldest first"""
+        n = min(self.count, self.capacity)
+        if frames is not None:
+            n = min(n, frames)
+        order = np.arange(self.count - n, self.count) % self.capacity
+        return self.starts[order], self.durations[order]
+
+    def summary(self, frames=60):
+        """Mean ms per phase and frames per second over the last frames"""
+        starts, durations = self.recent(frames)
+        means = dict(zip(self.phases, durations.mean(axis=0) if len(durations) else np.zeros(len(self.phases))))
+        elapsed = starts[-1] - starts[0] if len(starts) > 1 else 0.0
+        fps = (len(starts) - 1) / elapsed if elapsed > 0 else 0.0
+        return means, fps
+
+    def dump(self, path):
+        """Write the recorded frames as JSON (.json) or CSV (anything else)"""
+        starts, durations = self.recent()
+        if path.endswith(".json"):
+            trace = {
+                "phases": list(self.phases),
+                "frames": [dict(start=float(start), **dict(zip(self.phases, row.tolist())))
+                           for start, row in zip(starts, durations)],
+            }
+            with open(path, "w") as f:
+                json.dump(trace, f, indent=1)
+            return
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["start"] + [f"{phase}_ms" for phase in self.phases])
+            for start, row in zip(starts, durations):
+                writer.writerow([f"{start:.6f}"] + [f"{value:.4f}" for value in row])
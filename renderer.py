@@ -0,0 +1,149 @@
+import numpy as np
+from OpenGL.GL import *
+
+from cube import cube_faces, cube_edges
+
+
+def as_vertex_array(vertices):
+    """Return vertices as a contiguous (N, 3) float32 array"""
+    return np.ascontiguousarray(np.asarray(vertices, dtype=np.float32).reshape(-1, 3))
+
+
+def draw_arrays(mode, vertices, indices=None, colors=None):
+    """Draw a client-side vertex array with a single glDrawArrays/glDrawElements call"""
+    vertices = as_vertex_array(vertices)
+    if len(vertices) == 0:
+        return
+
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glVertexPointer(3, GL_FLOAT, 0, vertices)
+    if colors is not None:
+        colors = np.ascontiguousarray(colors, dtype=np.float32)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glColorPointer(colors.shape[-1], GL_FLOAT, 0, colors)
+
+    if indices is None:
+        glDrawArrays(mode, 0, len(vertices))
+    else:
+        indices = np.ascontiguousarray(indices, dtype=np.uint32).ravel()
+        glDrawElements(mode, len(indices), GL_UNSIGNED_INT, indices)
+
+    if colors is not None:
+        glDisableClientState(GL_COLOR_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+
+
+class VertexBuffer:
+    """Float32 vertex array kept in a VBO and drawn with one call per primitive group"""
+
+    def __init__(self, vertices=None, mode=GL_LINES, indices=None, colors=None, usage=GL_DYNAMIC_DRAW):
+        self.mode = mode
+        self.usage = usage
+        self.vertices = np.zeros((0, 3), dtype=np.float32)
+        self.indices = None if indices is None else np.ascontiguousarray(indices, dtype=np.uint32).ravel()
+        self.colors = None if colors is None else np.ascontiguousarray(colors, dtype=np.float32)
+
+        # GL state is created lazily on first draw so buffers can be built before a context exists
+        self.vbo = None
+        self.vbo_size = 0
+        self.dirty = True
+        self.dirty_range = None  # (start, end) vertices to upload when only part changed
+
+        if vertices is not None:
+            self.update(vertices)
+
+    def update(self, vertices):
+        """Replace the vertex data in bulk; uploaded on the next draw"""
+        vertices = np.asarray(vertices).reshape(-1, 3)
+        if vertices.shape == self.vertices.shape:
+            np.copyto(self.vertices, vertices, casting='unsafe')
+        else:
+            self.vertices = as_vertex_array(vertices)
+        self.dirty = True
+
+    def invalidate_range(self, start, end):
+        """Mark vertices[start:end] as changed in place; only changed ranges are uploaded"""
+        if self.dirty_range is not None:
+            start = min(start, self.dirty_range[0])
+            end = max(end, self.dirty_range[1])
+        self.dirty_range = (start, end)
+
+    def upload(self):
+        """Push the vertex array to the GPU, reusing the existing allocation when it fits"""
+        if self.vbo is None:
+            self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        if self.vertices.nbytes != self.vbo_size:
+            glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, self.usage)
+            self.vbo_size = self.vertices.nbytes
+        elif self.dirty:
+            glBufferSubData(GL_ARRAY_BUFFER, 0, self.vertices.nbytes, self.vertices)
+        else:
+            start, end = self.dirty_range
+            part = self.vertices[start:end]
+            glBufferSubData(GL_ARRAY_BUFFER, start * self.vertices.itemsize * 3, part.nbytes, part)
+        self.dirty = False
+        self.dirty_range = None
+
+    def draw(self, mode=None, indices=None, first=0, count=None):
+        """Draw the buffer, optionally with a different mode, index set or range of vertices"""
+        if len(self.vertices) == 0 or (indices is not None and len(indices) == 0):
+            return
+        if self.dirty or self.dirty_range is not None:
+            self.upload()
+        else:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+
+        mode = self.mode if mode is None else mode
+        indices = self.indices if indices is None else indices
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        if self.colors is not None:
+            glEnableClientState(GL_COLOR_ARRAY)
+            glColorPointer(self.colors.shape[-1], GL_FLOAT, 0, self.colors)
+
+        if indices is None:
+            glDrawArrays(mode, first, len(self.vertices) - first if count is None else count)
+        else:
+            glDrawElements(mode, len(indices), GL_UNSIGNED_INT, indices)
+
+        if self.colors is not None:
+            glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def delete(self):
+        """Release the GPU buffer"""
+        if self.vbo is not None:
+            glDeleteBuffers(1, [self.vbo])
+            self.vbo = None
+            self.vbo_size = 0
+            self.dirty = True
+            self.dirty_range = None
+
+
+class CubeMesh:
+    """Cube faces, edges and corner points sharing one vertex buffer"""
+
+    FACES = cube_faces.ravel()
+    EDGES = cube_edges.ravel()
+
+    def __init__(self, vertices):
+        self.buffer = VertexBuffer(vertices, mode=GL_POINTS)
+
+    def update(self, vertices):
+        """Replace the cube corner positions"""
+        self.buffer.update(vertices)
+
+    def draw_faces(self):
+        self.buffer.draw(GL_QUADS, self.FACES)
+
+    def draw_edges(self):
+        self.buffer.draw(GL_LINES, self.EDGES)
+
+    def draw_points(self):
+        self.buffer.draw(GL_POINTS)
+
+    def delete(self):
+        self.buffer.delete()
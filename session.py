@@ -0,0 +1,200 @@
+"""Session recording and replay for reproducible profiling
+
+A session log is JSON lines, gzip-compressed when the path ends in .gz. The
+first line is a header with the scene settings the session started from;
+every later line is one iteration of the render loop that did something:
+
+    {"time": 0.53, "events": [{"type": "MOUSEMOTION", "pos": [700, 412]}],
+     "matrix": null, "commands": [], "clock": [0.5301], "render": true, "load_shedding": 0}
+
+time is wall-clock seconds since recording started. clock holds every value
+the visualizer read from its time source during the iteration, relative to
+the same start. matrix is the matrix taken from the editor, and commands are
+the control-server commands that ran. A replay feeds the same inputs to the
+same handlers and answers time-source reads from clock, so animations follow
+the recorded path however long the replayed frames take.
+
+    python main.py --record session.jsonl.gz
+    python main.py --replay session.jsonl.gz --fast --profile-trace trace.csv
+"""
+import collections
+import gzip
+import json
+import time
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+# Event types kept in the log (by pygame constant name) and the attributes the handlers read
+RECORDED_EVENTS = {
+    "QUIT": (),
+    "KEYDOWN": ("key",),
+    "MOUSEMOTION": ("pos",),
+    "MOUSEBUTTONDOWN": ("button", "pos"),
+    "MOUSEBUTTONUP": ("button", "pos"),
+    "VIDEOEXPOSE": (),
+    "VIDEORESIZE": (),
+    "ACTIVEEVENT": (),
+    "WINDOWEXPOSED": (),
+    "WINDOWSHOWN": (),
+    "WINDOWRESTORED": (),
+    "WINDOWSIZECHANGED": (),
+}
+
+SessionFrame = collections.namedtuple("SessionFrame", [
+    "time",           # Seconds since the recording started
+    "events",         # pygame events handled in the iteration
+    "matrix",         # Matrix taken from the editor, or None
+    "commands",       # Control-server (name, argument) commands
+    "render",         # Whether a frame was drawn
+    "load_shedding",  # Frame-budget level the frame was drawn at
+])
+
+
+def open_log(path, mode):
+    """Open a session log for text reading ("r") or writing ("w"), gzip-compressed for .gz paths"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def encode_event(event, names):
+    """JSON form of a pygame event, or None for events that are not recorded
+
+    names maps pygame event types to their RECORDED_EVENTS name.
+    """
+    name = names.get(event.type)
+    if name is None:
+        return None
+    record = {"type": name}
+    for attribute in RECORDED_EVENTS[name]:
+        value = getattr(event, attribute)
+        record[attribute] = list(value) if isinstance(value, tuple) else value
+    return record
+
+
+def decode_event(record):
+    """pygame event from its JSON form"""
+    import pygame
+
+    attributes = {key: tuple(value) if isinstance(value, list) else value
+                  for key, value in record.items() if key != "type"}
+    return pygame.event.Event(getattr(pygame, record["type"]), attributes)
+
+
+def event_names():
+    """pygame event type -> RECORDED_EVENTS name, for the event types this pygame has"""
+    import pygame
+
+    return {getattr(pygame, name): name for name in RECORDED_EVENTS if hasattr(pygame, name)}
+
+
+def encode_command(name, argument):
+    if isinstance(argument, np.ndarray):
+        argument = argument.tolist()
+    return [name, argument]
+
+
+def decode_command(record):
+    name, argument = record
+    if name == "apply":
+        argument = np.asarray(argument, dtype=float).reshape(3, 3)
+    return name, argument
+
+
+class SessionRecorder:
+    """Writes the header and then one log line per loop iteration
+
+    Call begin() at the start of each iteration and end() once it is done;
+    wrap the visualizer's time source with clock() so its reads are logged.
+    """
+
+    def __init__(self, path, header):
+        self.path = path
+        self.file = open_log(path, "w")
+        self.names = event_names()
+        self.start = time.perf_counter()
+        self.started = 0.0
+        self.reads = []
+        self.iterations = 0
+        self.write(dict(header, version=FORMAT_VERSION))
+
+    def write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def clock(self, source):
+        """Time source reading source relative to now and logging each value"""
+        origin = source()
+
+        def read():
+            value = source() - origin
+            self.reads.append(value)
+            return value
+        return read
+
+    def begin(self):
+        self.started = time.perf_counter() - self.start
+
+    def end(self, events, matrix, commands, render, load_shedding):
+        """Log the iteration unless nothing happened in it"""
+        events = [record for record in (encode_event(event, self.names) for event in events) if record]
+        if not (events or matrix is not None or commands or render or self.reads):
+            return
+        self.write({
+            "time": round(self.started, 6),
+            "events": events,
+            "matrix": None if matrix is None else np.asarray(matrix, dtype=float).tolist(),
+            "commands": [encode_command(name, argument) for name, argument in commands],
+            "clock": self.reads,
+            "render": render,
+            "load_shedding": load_shedding,
+        })
+        self.reads = []
+        self.iterations += 1
+
+    def close(self):
+        self.file.close()
+
+
+class SessionReplay:
+    """A recorded session, iterated as SessionFrames
+
+    read_clock() answers the visualizer's time-source reads with the values
+    recorded for the current frame. A visualizer that reads the clock more
+    often than the recorded one sees the last value again; unused values
+    are dropped when the next frame starts.
+    """
+
+    def __init__(self, path):
+        with open_log(path, "r") as f:
+            lines = [line for line in f if line.strip()]
+        if not lines:
+            raise ValueError(f"Empty session log: {path}")
+        self.header = json.loads(lines[0])
+        if self.header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported session log version: {self.header.get('version')!r}")
+        self.records = [json.loads(line) for line in lines[1:]]
+        self.reads = collections.deque()
+        self.last_read = 0.0
+
+    def __len__(self):
+        return len(self.records)
+
+    def frames(self):
+        for record in self.records:
+            self.reads = collections.deque(record["clock"])
+            matrix = record["matrix"]
+            yield SessionFrame(
+                time=record["time"],
+                events=[decode_event(event) for event in record["events"]],
+                matrix=None if matrix is None else np.asarray(matrix, dtype=float),
+                commands=[decode_command(command) for command in record["commands"]],
+                render=record["render"],
+                load_shedding=record["load_shedding"],
+            )
+
+    def read_clock(self):
+        if self.reads:
+            self.last_read = self.reads.popleft()
+        return self.last_read
@@ -0,0 +1,135 @@
+import numpy as np
+import pygame
+from OpenGL.GL import *
+
+FIRST_CHAR = 32
+LAST_CHAR = 126
+ATLAS_WIDTH = 512
+
+
+class GlyphAtlas:
+    """Printable ASCII glyphs rendered once with pygame.font into a single texture"""
+
+    def __init__(self, size=22):
+        pygame.font.init()
+        font = pygame.font.Font(None, size)
+        self.line_height = font.get_linesize()
+
+        surfaces = [font.render(chr(code), True, (255, 255, 255)) for code in range(FIRST_CHAR, LAST_CHAR + 1)]
+
+        # Shelf-pack the glyphs into rows of the atlas
+        positions = []
+        x = y = 0
+        row_height = 0
+        for surface in surfaces:
+            w, h = surface.get_size()
+            if x + w > ATLAS_WIDTH:
+                x = 0
+                y += row_height + 1
+                row_height = 0
+            positions.append((x, y))
+            x += w + 1
+            row_height = max(row_height, h)
+        height = 1 << max(int(np.ceil(np.log2(y + row_height))), 0)
+
+        self.pixels = np.zeros((height, ATLAS_WIDTH, 4), dtype=np.uint8)
+        self.glyphs = {}
+        for code, surface, (gx, gy) in zip(range(FIRST_CHAR, LAST_CHAR + 1), surfaces, positions):
+            w, h = surface.get_size()
+            rgba = np.frombuffer(pygame.image.tostring(surface, "RGBA"), dtype=np.uint8).reshape(h, w, 4)
+            self.pixels[gy:gy + h, gx:gx + w] = rgba
+            # Advance, height and texture rectangle of the glyph
+            self.glyphs[chr(code)] = (w, h, gx / ATLAS_WIDTH, gy / height,
+                                      (gx + w) / ATLAS_WIDTH, (gy + h) / height)
+
+        # Uploaded on first bind, once a GL context exists
+        self.texture = None
+
+    def bind(self):
+        if self.texture is None:
+            self.texture = glGenTextures(1)
+            glBindTexture(GL_TEXTURE_2D, self.texture)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+            glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, self.pixels.shape[1], self.pixels.shape[0], 0,
+                         GL_RGBA, GL_UNSIGNED_BYTE, self.pixels)
+        else:
+            glBindTexture(GL_TEXTURE_2D, self.texture)
+
+    def layout(self, text, x, y):
+        """Screen-space quad corners and texture coordinates for a string, one quad per glyph"""
+        fallback = self.glyphs["?"]
+        vertices = []
+        texcoords = []
+        cx = x
+        for char in text:
+            if char == "\n":
+                cx = x
+                y += self.line_height
+                continue
+            w, h, u0, v0, u1, v1 = self.glyphs.get(char, fallback)
+            vertices.extend([(cx, y), (cx + w, y), (cx + w, y + h), (cx, y + h)])
+            texcoords.extend([(u0, v0), (u1, v0), (u1, v1), (u0, v1)])
+            cx += w
+        return (np.array(vertices, dtype=np.float32).reshape(-1, 2),
+                np.array(texcoords, dtype=np.float32).reshape(-1, 2))
+
+
+class TextLabel:
+    """A string drawn from the atlas whose quads are rebuilt only when the text or position changes"""
+
+    def __init__(self, atlas):
+        self.atlas = atlas
+        self.key = None
+        self.vertices = np.zeros((0, 2), dtype=np.float32)
+        self.texcoords = np.zeros((0, 2), dtype=np.float32)
+        self.width = 0.0
+
+    def set_text(self, text, x, y):
+        key = (text, x, y)
+        if key != self.key:
+            self.key = key
+            self.vertices, self.texcoords = self.atlas.layout(text, x, y)
+            self.width = float(self.vertices[:, 0].max()) - x if len(self.vertices) else 0.0
+
+    def draw(self):
+        """Draw the quads; expects the atlas bound and vertex/texcoord arrays enabled"""
+        if len(self.vertices) == 0:
+            return
+        glVertexPointer(2, GL_FLOAT, 0, self.vertices)
+        glTexCoordPointer(2, GL_FLOAT, 0, self.texcoords)
+        glDrawArrays(GL_QUADS, 0, len(self.vertices))
+
+
+class TextPanel:
+    """Fixed set of text lines, each cached as its own label"""
+
+    def __init__(self, atlas=None):
+        self.atlas = atlas or GlyphAtlas()
+        self.labels = []
+
+    def layout(self, lines, x, y):
+        """Lay out lines top to bottom from (x, y); returns the width of the widest in pixels"""
+        while len(self.labels) < len(lines):
+            self.labels.append(TextLabel(self.atlas))
+        for i, line in enumerate(lines):
+            self.labels[i].set_text(line, x, y + i * self.atlas.line_height)
+        return max((label.width for label in self.labels[:len(lines)]), default=0.0)
+
+    def draw(self, lines, x, y):
+        """Draw lines top to bottom from (x, y) in the current colour, in a 2D projection
+
+        Unchanged lines reuse their cached quads.
+        """
+        self.layout(lines, x, y)
+
+        glEnable(GL_TEXTURE_2D)
+        self.atlas.bind()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        for label in self.labels[:len(lines)]:
+            label.draw()
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glDisable(GL_TEXTURE_2D)
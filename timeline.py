@@ -0,0 +1,128 @@
+import collections
+import numpy as np
+
+from transform import apply_matrix, interpolate_vertices
+
+MAX_CACHED_BYTES = 256 * 1024 * 1024  # Transformed keyframe geometry kept for seeking
+
+
+class Timeline:
+    """Sequence of keyframe matrices applied one after another
+
+    Keyframe k composes the first k matrices, so the timeline runs from the
+    identity through M1, M2 @ M1, M3 @ M2 @ M1, ... Time is measured in
+    segments: t = 1.5 is halfway between the first and second keyframe.
+    Cumulative products and the geometry transformed by them are cached, so
+    seeking costs one interpolation between two cached arrays. Transformed
+    geometry keeps the input dtype, and the cache holds at most
+    max_cached_bytes of it (always at least one keyframe).
+    """
+
+    def __init__(self, geometry, out=None, max_cached_bytes=MAX_CACHED_BYTES):
+        self.matrices = []
+        self.cumulative = [np.eye(3)]
+        self.max_cached_bytes = max_cached_bytes
+        self.cached_bytes = 0
+        self.time = 0.0
+        self.playing = False
+        self.loop = False
+        self.set_geometry(geometry, out)
+
+    def set_geometry(self, geometry, out=None):
+        """Replace the untransformed geometry (name -> (..., 3) array) and drop cached results
+
+        Seeking writes into the arrays in out, or into private copies when out is None.
+        """
+        self.geometry = geometry
+        self.cache = collections.OrderedDict()
+        self.cached_bytes = 0
+        if out is None:
+            out = {name: np.array(vertices, copy=True) for name, vertices in geometry.items()}
+        self.current = out
+
+    @property
+    def duration(self):
+        return float(len(self.matrices))
+
+    def add_keyframe(self, matrix):
+        """Append a matrix, applied after every keyframe already on the timeline"""
+        matrix = np.asarray(matrix, dtype=float)
+        self.matrices.append(matrix)
+        self.cumulative.append(matrix @ self.cumulative[-1])
+
+    def clear(self):
+        self.matrices = []
+        self.cumulative = [np.eye(3)]
+        self.cache.clear()
+        self.cached_bytes = 0
+        self.time = 0.0
+        self.playing = False
+
+    def keyframe_geometry(self, k):
+        """Geometry transformed by the k-th cumulative matrix, computed once and cached"""
+        if k in self.cache:
+            self.cache.move_to_end(k)
+            return self.cache[k]
+        transformed = {name: apply_matrix(self.cumulative[k], vertices)
+                       for name, vertices in self.geometry.items()}
+        self.cache[k] = transformed
+        self.cached_bytes += sum(vertices.nbytes for vertices in transformed.values())
+        while self.cached_bytes > self.max_cached_bytes and len(self.cache) > 1:
+            _, evicted = self.cache.popitem(last=False)
+            self.cached_bytes -= sum(vertices.nbytes for vertices in evicted.values())
+        return transformed
+
+    def locate(self, t):
+        """Split time into a segment index and an eased fraction within it"""
+        t = min(max(t, 0.0), self.duration)
+        k = min(int(t), max(len(self.matrices) - 1, 0))
+        local = t - k
+        return k, local * local * (3.0 - 2.0 * local)
+
+    def matrix_at(self, t):
+        """Interpolated matrix at time t"""
+        if not self.matrices:
+            return np.eye(3)
+        k, s = self.locate(t)
+        return (1 - s) * self.cumulative[k] + s * self.cumulative[k + 1]
+
+    def seek(self, t):
+        """Move to time t and update the current geometry in place"""
+        self.time = min(max(t, 0.0), self.duration)
+        if not self.matrices:
+            return self.current
+        k, s = self.locate(self.time)
+        start = self.keyframe_geometry(k)
+        end = self.keyframe_geometry(k + 1)
+        for name, out in self.current.items():
+            interpolate_vertices(start[name], end[name], s, out=out)
+        return self.current
+
+    def step(self, dt):
+        """Advance a playing timeline by dt segments; returns True if time moved"""
+        if not self.playing or not self.matrices:
+            return False
+        t = self.time + dt
+        if t >= self.duration:
+            if self.loop:
+                t %= self.duration
+            else:
+                t = self.duration
+                self.playing = False
+        self.seek(t)
+        return True
+
+    def play(self):
+        if self.matrices:
+            if self.time >= self.duration and not self.loop:
+                self.time = 0.0
+            self.playing = True
+
+    def pause(self):
+        self.playing = False
+
+    def toggle(self):
+        if self.playing:
+            self.pause()
+        else:
+            self.play()
@@ -1,17 +1,44 @@
 ### transform.py
 import numpy as np
 
-def apply_matrix(matrix, vertices):
-    transformed = []
-    for v in vertices:
-        vec = np.array(v)
-        new_v = matrix @ vec
-        transformed.append(new_v.tolist())
-    return transformed
+def as_vertices(vertices):
+    """Return vertices as a floating-point array of shape (..., 3), keeping float32 data as is"""
+    vertices = np.asarray(vertices)
+    if vertices.dtype.kind != 'f':
+        vertices = vertices.astype(float)
+    return vertices
 
-def lerp(v1, v2, t):
-    return [v1[i] + (v2[i] - v1[i]) * t for i in range(3)]
+def apply_matrix(matrix, vertices, out=None):
+    """Apply a 3x3 matrix to every row vector of an (..., 3) array in one matmul
 
-def interpolate_vertices(v1, v2, t):
-    return [lerp(a, b, t) for a, b in zip(v1, v2)]
+    The result has the vertices' dtype, so float32 meshes and lattices stay float32.
+    """
+    vertices = as_vertices(vertices)
+    matrix = np.asarray(matrix, dtype=vertices.dtype)
+    return np.matmul(vertices, matrix.T, out=out)
 
+def lerp(v1, v2, t, out=None):
+    """Linear interpolation v1 + (v2 - v1) * t, written into out when given"""
+    if out is None:
+        return v1 + (np.asarray(v2) - v1) * t
+    # out must not alias v1, since v1 is read after out is overwritten
+    np.subtract(v2, v1, out=out)
+    out *= t
+    out += v1
+    return out
+
+def interpolate_vertices(v1, v2, t, out=None):
+    """Interpolate two (..., 3) vertex arrays, in place when out is given"""
+    return lerp(as_vertices(v1), as_vertices(v2), t, out=out)
+
+def lerp_delta(start, delta, t, out):
+    """Fused start + delta * t written into a preallocated out buffer without temporaries"""
+    np.multiply(delta, t, out=out)
+    np.add(out, start, out=out)
+    return out
+
+def homogeneous(matrix):
+    """4x4 homogeneous form of a 3x3 linear map, for use as an OpenGL model matrix"""
+    result = np.eye(4)
+    result[:3, :3] = matrix
+    return result